@@ -0,0 +1,67 @@
+-- Upgrade an existing database to the current schema.sql constraints.
+--
+-- schema.sql only runs when the Postgres volume is first initialised; databases created
+-- before these constraints were introduced must run this once (it is idempotent):
+--   docker compose exec -T db psql -v ON_ERROR_STOP=1 -U app -d appdb < migrations/001_unique_indexes.sql
+--
+-- Stop the API while it runs: registrations need idx_users_email_lower (ON CONFLICT target)
+-- and rely on idx_activation_codes_code being UNIQUE to retry colliding codes.
+
+BEGIN;
+
+-- 1. Case-insensitive emails -------------------------------------------------------------
+
+-- Inactive duplicates of an address (by lower(email)) can never log in: drop them, keeping
+-- the active account, or the oldest one when none is active (their codes cascade)
+DELETE FROM users
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY lower(email) ORDER BY COALESCE(is_active, FALSE) DESC, created_at, id
+        ) AS position_in_address
+        FROM users
+    ) ranked
+    WHERE position_in_address > 1
+)
+AND NOT COALESCE(is_active, FALSE);
+
+-- Several *active* accounts for one address need a human decision: abort, change nothing
+DO $$
+DECLARE
+    duplicates INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO duplicates FROM (
+        SELECT 1 FROM users GROUP BY lower(email) HAVING COUNT(*) > 1
+    ) d;
+    IF duplicates > 0 THEN
+        RAISE EXCEPTION '% email address(es) have several active accounts; merge them first: SELECT lower(email), array_agg(id) FROM users GROUP BY 1 HAVING COUNT(*) > 1', duplicates;
+    END IF;
+END
+$$;
+
+-- Stored emails in the canonical form the service looks up
+UPDATE users SET email = lower(email) WHERE email <> lower(email);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email));
+
+-- 2. One pending activation per code ----------------------------------------------------
+
+-- Expired codes are worthless; among live duplicates keep the newest (others can resend)
+DELETE FROM activation_codes WHERE expires_at < CURRENT_TIMESTAMP;
+DELETE FROM activation_codes
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY code ORDER BY created_at DESC, id
+        ) AS position_in_code
+        FROM activation_codes
+    ) ranked
+    WHERE position_in_code > 1
+);
+
+-- Older databases have a plain index under this name, which IF NOT EXISTS would keep:
+-- replace it so code collisions raise UniqueViolation (retried by the repositories)
+DROP INDEX IF EXISTS idx_activation_codes_code;
+CREATE UNIQUE INDEX idx_activation_codes_code ON activation_codes(code);
+
+COMMIT;
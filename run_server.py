@@ -10,20 +10,41 @@ import uvicorn
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-# Check if virtual environment is activated
-if not hasattr(sys, "real_prefix") and not (
-    hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix
-):
-    print(
-        "Erreur: Environnement virtuel non activé. Veuillez activer votre environnement virtuel avant d'exécuter ce script."
-    )
-    sys.exit(1)
 
-# Install production dependencies
-os.system("pip install -r requirements.txt")
+def _prepare_environment() -> None:
+    """Check the virtualenv and optionally install dependencies (launcher process only)."""
+    # Check if virtual environment is activated
+    if not hasattr(sys, "real_prefix") and not (
+        hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix
+    ):
+        print(
+            "Erreur: Environnement virtuel non activé. Veuillez activer votre environnement virtuel avant d'exécuter ce script."
+        )
+        sys.exit(1)
+
+    # Dependencies are installed once at setup time, not on every launch.
+    # Set AUTO_INSTALL=1 to (re)install them before starting.
+    if os.getenv("AUTO_INSTALL") == "1":
+        os.system("pip install -r requirements.txt")
+        os.system("pip install -r requirements-dev.txt")
 
-# Install development dependencies
-os.system("pip install -r requirements-dev.txt")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="info", app_dir="src")
+    # Guarded: the reload subprocess is spawned and re-imports this file
+    _prepare_environment()
+
+    from src.config.settings import get_settings
+
+    settings = get_settings()
+    uvicorn.run(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        # Uvicorn cannot combine hot-reload with several workers
+        workers=1 if settings.reload else settings.workers,
+        loop="uvloop",
+        http="httptools",
+        reload=settings.reload,
+        log_level="info",
+        app_dir="src",
+    )
@@ -39,13 +39,13 @@ pip install -r requirements-test.txt
 # Handle different test modes
 if [ "$1" = "--unit" ]; then
     print_info "Running unit tests only (fast, in-memory)..."
-    python -m pytest -m unit -v --cov=src --cov-report=html --cov-report=term-missing
+    python -m pytest -m unit -n auto -v --cov=src --cov-report=html --cov-report=term-missing
 elif [ "$1" = "--integration" ]; then
     print_info "Running integration tests only (PostgreSQL)..."
-    python -m pytest -m integration -v --cov=src --cov-report=html --cov-report=term-missing
+    python -m pytest -m integration -n auto -v --cov=src --cov-report=html --cov-report=term-missing
 else
     print_info "Running complete test suite with coverage..."
-    python -m pytest -v --cov=src --cov-report=html --cov-report=term-missing
+    python -m pytest -n auto -v --cov=src --cov-report=html --cov-report=term-missing
 fi
 
 if [ $? -eq 0 ]; then
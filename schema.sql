@@ -1,11 +1,8 @@
 -- Database schema for Simple Auth API
 
--- Create extension for UUID generation if not exists
-CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
-
 -- Users table
 CREATE TABLE IF NOT EXISTS users (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
     is_active BOOLEAN DEFAULT FALSE,
@@ -15,7 +12,7 @@ CREATE TABLE IF NOT EXISTS users (
 
 -- Activation codes table
 CREATE TABLE IF NOT EXISTS activation_codes (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     code VARCHAR(4) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -28,9 +25,13 @@ CREATE TABLE IF NOT EXISTS activation_codes (
 
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+-- Emails are stored lowercased by the service; lookups use lower(email) (this index) so rows
+-- stored with another case still match, and case variants of an address are rejected
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email));
 CREATE INDEX IF NOT EXISTS idx_users_is_active ON users(is_active);
 CREATE INDEX IF NOT EXISTS idx_activation_codes_user_id ON activation_codes(user_id);
-CREATE INDEX IF NOT EXISTS idx_activation_codes_code ON activation_codes(code);
+-- Unique: a code identifies exactly one pending activation (collisions are retried by the app)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_activation_codes_code ON activation_codes(code);
 CREATE INDEX IF NOT EXISTS idx_activation_codes_expires_at ON activation_codes(expires_at);
 
 -- Update trigger for updated_at
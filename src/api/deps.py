@@ -1,34 +1,84 @@
 """FastAPI-specific dependencies and middleware."""
 
+import hashlib
+import re
+import threading
 from typing import Annotated
 
-from fastapi import Depends, Header, HTTPException
+from cachetools import TTLCache
+from fastapi import Depends, Header, HTTPException, Request
 
 from src.di import get_container
 from src.di.container import AppContainer
 from src.services.exceptions import InvalidCredentials, UserNotFound
 from src.services.models import User
+from src.services.token_service import TokenService
 from src.services.user_service import UserService
 
+# Exactly "Basic <token>" (one space, nothing trailing) with a syntactically valid base64
+# token, matched in full before touching the service
+_BASIC_RE: re.Pattern[bytes] = re.compile(rb"Basic ([A-Za-z0-9+/]+={0,2})")
 
-def get_user_service() -> UserService:
-    """FastAPI dependency for UserService."""
-    container: AppContainer = get_container()
-    return container.user_service()
+# Successful Basic Auth resolutions, keyed by a digest of the raw header.
+# Failed attempts are never stored, so guesses always pay the full bcrypt cost.
+# Only active users authenticate, and no API route changes a password or deactivates an
+# account, so entries never go stale through the API. A change made directly in the
+# database (password reset, deactivation) is seen by each worker within the 30 s TTL:
+# that window is an accepted limitation, documented in the README.
+_auth_cache: TTLCache[bytes, User] = TTLCache(maxsize=10_000, ttl=30)
+_auth_cache_lock = threading.Lock()
 
 
-def get_current_user(
+def _basic_auth_challenge(detail: str) -> HTTPException:
+    """Build a 401 response asking the client for Basic Auth credentials."""
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Basic"})
+
+
+def _bearer_challenge(detail: str) -> HTTPException:
+    """Build a 401 response for a missing or rejected Bearer token."""
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def get_user_service(request: Request) -> UserService:
+    """FastAPI dependency for UserService (bound to app.state at startup)."""
+    user_service: UserService | None = getattr(request.app.state, "user_service", None)
+    if user_service is None:
+        # Lifespan didn't run (e.g. TestClient used without a context manager)
+        container: AppContainer = get_container()
+        user_service = container.user_service()
+    return user_service
+
+
+# Shared dependency declarations: every endpoint references the same Depends
+# object, so FastAPI resolves each one once per request and reuses the result
+UserServiceDep = Annotated[UserService, Depends(dependency=get_user_service)]
+
+
+def get_token_service(request: Request) -> TokenService:
+    """FastAPI dependency for TokenService (bound to app.state at startup)."""
+    token_service: TokenService | None = getattr(request.app.state, "token_service", None)
+    if token_service is None:
+        # Lifespan didn't run (e.g. TestClient used without a context manager)
+        container: AppContainer = get_container()
+        token_service = container.token_service()
+    return token_service
+
+
+TokenServiceDep = Annotated[TokenService, Depends(dependency=get_token_service)]
+
+
+def get_basic_user(
+    user_service: UserServiceDep,
     authorization: Annotated[str | None, Header()] = None,
-    user_service: UserService = Depends(dependency=get_user_service),
 ) -> User:
     """
-    FastAPI dependency to get the current authenticated user.
+    FastAPI dependency to authenticate the user with Basic Auth only.
 
     Extracts and validates Basic Auth credentials from the Authorization header.
 
     Args:
-        authorization: Authorization header with Basic auth credentials
         user_service: Injected user service instance
+        authorization: Authorization header with Basic auth credentials
 
     Returns:
         User: The authenticated and active user
@@ -38,42 +88,96 @@ def get_current_user(
                       403 if account is not activated
     """
     if not authorization:
-        raise HTTPException(
-            status_code=401,
-            detail="Authorization header required",
-            headers={"WWW-Authenticate": "Basic"},
-        )
+        raise _basic_auth_challenge(detail="Authorization header required")
 
     try:
-        user: User = user_service.authenticate_basic(authorization_header=authorization)
-        return user
+        # Strict: a non-ASCII byte anywhere rejects the header instead of being dropped
+        raw_header: bytes = authorization.encode("ascii")
+    except UnicodeEncodeError as e:
+        raise _basic_auth_challenge(detail="Invalid credentials") from e
+    match: re.Match[bytes] | None = _BASIC_RE.fullmatch(raw_header)
+    if match is None:
+        raise _basic_auth_challenge(detail="Invalid credentials")
+    encoded_credentials: bytes = match.group(1)
+
+    cache_key: bytes = hashlib.blake2b(encoded_credentials, digest_size=16).digest()
+    with _auth_cache_lock:
+        cached_user: User | None = _auth_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
+
+    try:
+        user: User = user_service.authenticate_basic_credentials(
+            encoded_credentials=encoded_credentials
+        )
     except (InvalidCredentials, UserNotFound) as e:
         # All authentication failures should return 401 with WWW-Authenticate header
         # to trigger browser's Basic Auth prompt
-        raise HTTPException(
-            status_code=401, detail="Invalid credentials", headers={"WWW-Authenticate": "Basic"}
-        ) from e
+        raise _basic_auth_challenge(detail="Invalid credentials") from e
+
+    with _auth_cache_lock:
+        _auth_cache[cache_key] = user
+    return user
+
 
+BasicUserDep = Annotated[User, Depends(dependency=get_basic_user)]
 
-def require_active_user(current_user: User = Depends(dependency=get_current_user)) -> User:
+
+def get_current_user(
+    user_service: UserServiceDep,
+    token_service: TokenServiceDep,
+    authorization: Annotated[str | None, Header()] = None,
+) -> User:
     """
-    FastAPI dependency to ensure the user account is activated.
+    FastAPI dependency to get the current authenticated user.
+
+    Accepts a Bearer access token (one HMAC check) and falls back to Basic Auth
+    (bcrypt verification) for clients that haven't requested a token.
 
     Args:
-        current_user: The authenticated user from get_current_user
+        user_service: Injected user service instance
+        token_service: Injected access token service instance
+        authorization: Authorization header with Bearer token or Basic auth credentials
 
     Returns:
         User: The authenticated and active user
 
     Raises:
-        HTTPException: 403 if account is not activated
+        HTTPException: 401 if the token or credentials are invalid
+                      403 if account is not activated
     """
-    if not current_user.is_active:
+    user: User | None
+    if authorization and authorization[:7].lower() == "bearer ":
+        try:
+            user_id: str = token_service.verify(token=authorization[7:].strip())
+        except InvalidCredentials as e:
+            raise _bearer_challenge(detail="Invalid or expired token") from e
+
+        user = user_service.get_user_by_id(user_id=user_id)
+        if user is None:
+            raise _bearer_challenge(detail="Invalid or expired token")
+    else:
+        user = get_basic_user(user_service=user_service, authorization=authorization)
+
+    # Checked here rather than in a second dependency layer on every endpoint
+    if not user.is_active:
         raise HTTPException(
             status_code=403,
             detail="Account not activated. Please check your email for activation code.",
         )
-    return current_user
+    return user
+
+
+def clear_auth_cache() -> None:
+    """Drop every cached Basic Auth resolution of this process (used by the tests).
+
+    Nothing in the API calls it: see the staleness note on _auth_cache.
+    """
+    with _auth_cache_lock:
+        _auth_cache.clear()
+
+
+CurrentUserDep = Annotated[User, Depends(dependency=get_current_user)]
 
 
 def get_container_health() -> dict[str, str | dict[str, str]]:
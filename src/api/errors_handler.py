@@ -1,69 +1,46 @@
 """Custom error handlers for the FastAPI application."""
 
-from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, Response
 
 from src.services.exceptions import (
     AccountNotActivated,
     ActivationCodeInvalid,
+    AuthenticationError,
     InvalidCredentials,
+    InvalidEmail,
     PasswordTooWeak,
     PermissionDenied,
     UserAlreadyExists,
     UserNotFound,
 )
 
-
-def add_error_handlers(app) -> None:
-    """Attach custom exception handlers to the FastAPI app."""
-
-    @app.exception_handler(UserAlreadyExists)
-    def user_already_exists_handler(_request: Request, _exc: UserAlreadyExists) -> JSONResponse:
-        return JSONResponse(
-            status_code=400,
-            content={"detail": "User already exists"},
-        )
-
-    @app.exception_handler(UserNotFound)
-    def user_not_found_handler(_request: Request, _exc: UserNotFound) -> JSONResponse:
-        return JSONResponse(
-            status_code=404,
-            content={"detail": "User not found"},
-        )
-
-    @app.exception_handler(InvalidCredentials)
-    def invalid_credentials_handler(_request: Request, _exc: InvalidCredentials) -> JSONResponse:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Invalid credentials"},
+# Service exception -> (HTTP status, pre-serialized JSON body)
+_ERROR_RESPONSES: dict[type[AuthenticationError], tuple[int, bytes]] = {
+    UserAlreadyExists: (400, b'{"detail":"User already exists"}'),
+    UserNotFound: (404, b'{"detail":"User not found"}'),
+    InvalidCredentials: (401, b'{"detail":"Invalid credentials"}'),
+    ActivationCodeInvalid: (400, b'{"detail":"Invalid or expired activation code"}'),
+    AccountNotActivated: (403, b'{"detail":"Account not activated"}'),
+    PermissionDenied: (403, b'{"detail":"Permission denied"}'),
+    PasswordTooWeak: (400, b'{"detail":"Password too weak"}'),
+    InvalidEmail: (422, b'{"detail":"Invalid email address"}'),
+}
+
+
+def service_error_handler(_request: Request, exc: Exception) -> Response:
+    """Translate a service exception into its precomputed JSON error response."""
+    response: tuple[int, bytes] | None = _ERROR_RESPONSES.get(type(exc))
+    if response is None:
+        # Subclass of a mapped exception (the handler is registered per base class):
+        # use the closest mapped ancestor
+        response = next(
+            _ERROR_RESPONSES[cls] for cls in type(exc).__mro__ if cls in _ERROR_RESPONSES
         )
+    status_code, body = response
+    return Response(content=body, status_code=status_code, media_type="application/json")
 
-    @app.exception_handler(ActivationCodeInvalid)
-    def activation_code_invalid_handler(
-        _request: Request, _exc: ActivationCodeInvalid
-    ) -> JSONResponse:
-        return JSONResponse(
-            status_code=400,
-            content={"detail": "Invalid or expired activation code"},
-        )
-
-    @app.exception_handler(AccountNotActivated)
-    def account_not_activated_handler(_request: Request, _exc: AccountNotActivated) -> JSONResponse:
-        return JSONResponse(
-            status_code=403,
-            content={"detail": "Account not activated"},
-        )
 
-    @app.exception_handler(PermissionDenied)
-    def permission_denied_handler(_request: Request, _exc: PermissionDenied) -> JSONResponse:
-        return JSONResponse(
-            status_code=403,
-            content={"detail": "Permission denied"},
-        )
-
-    @app.exception_handler(PasswordTooWeak)
-    def password_too_weak_handler(_request: Request, _exc: PasswordTooWeak) -> JSONResponse:
-        return JSONResponse(
-            status_code=400,
-            content={"detail": "Password too weak"},
-        )
+def add_error_handlers(app: FastAPI) -> None:
+    """Attach custom exception handlers to the FastAPI app."""
+    for exc_class in _ERROR_RESPONSES:
+        app.add_exception_handler(exc_class, service_error_handler)
@@ -1,25 +1,35 @@
 """User-related API routes."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, EmailStr
-
-from src.api.deps import get_container_health, get_current_user, get_user_service
+from typing import Annotated
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, StringConstraints
+
+from src.api.deps import (
+    BasicUserDep,
+    CurrentUserDep,
+    TokenServiceDep,
+    UserServiceDep,
+    get_container_health,
+)
 from src.services.exceptions import (  # InvalidCredentials,
     ActivationCodeExpired,
     InvalidActivationCode,
     UserNotFound,
 )
-from src.services.models import User
-from src.services.user_service import UserService
 
 router = APIRouter(tags=["users"])
 
+# Cheap length bounds only: the address format is validated once, in UserService.create_account
+Email = Annotated[str, StringConstraints(min_length=3, max_length=254)]
+
 
 # Pydantic models for request/response
 class RegisterRequest(BaseModel):
     """Request model for user registration."""
 
-    email: EmailStr
+    email: Email
     password: str
 
 
@@ -32,7 +42,7 @@ class ActivationRequest(BaseModel):
 class ResendCodeRequest(BaseModel):
     """Request model for resending activation code."""
 
-    email: EmailStr
+    email: Email
 
 
 class UserResponse(BaseModel):
@@ -65,7 +75,28 @@ class ActivateUserRequest(BaseModel):
 class ResendCodeByIdRequest(BaseModel):
     """Request model for resending activation code by user ID."""
 
-    email: EmailStr
+    email: Email
+
+
+class TokenResponse(BaseModel):
+    """Response model for an issued access token."""
+
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+# Constant success payloads, validated and serialized once at import time
+_ACTIVATED_BODY: bytes = (
+    MessageResponse(message="Account activated successfully.").model_dump_json().encode()
+)
+_CODE_SENT_BODY: bytes = (
+    MessageResponse(
+        message="If the email exists and account is not activated, an activation code has been sent."
+    )
+    .model_dump_json()
+    .encode()
+)
 
 
 # Dependency injection is handled in src/api/deps.py
@@ -73,12 +104,22 @@ class ResendCodeByIdRequest(BaseModel):
 
 # POST /api/v1/users - Create a new user
 @router.post("/api/v1/users", response_model=RegisterResponse, status_code=201)
-def create_user(
-    request: RegisterRequest, user_service: UserService = Depends(get_user_service)
+async def create_user(
+    request: RegisterRequest, user_service: UserServiceDep, background_tasks: BackgroundTasks
 ) -> RegisterResponse:
     """Create a new user and send activation email."""
-    user = user_service.register(email=request.email, password=request.password)
-    user_id = user.id if user is not None else None
+    # Blocking DB/bcrypt work runs in the threadpool, never on the event loop
+    account = await run_in_threadpool(
+        user_service.create_account, email=request.email, password=request.password
+    )
+    user_id = None
+    if account is not None:
+        user, activation_code = account
+        user_id = user.id
+        # The email goes out after the response has been sent
+        background_tasks.add_task(
+            user_service.send_activation_email, email=user.email, code=activation_code.code
+        )
 
     return RegisterResponse(
         message="User registered successfully. Check your email for activation code.",
@@ -88,16 +129,18 @@ def create_user(
 
 # PATCH /api/v1/users/{id} - Activate a user
 @router.patch("/api/v1/users/{user_id}", response_model=MessageResponse)
-def activate_user(
+async def activate_user(
     user_id: str,
     request: ActivateUserRequest,
-    user_service: UserService = Depends(get_user_service),
-) -> MessageResponse:
+    user_service: UserServiceDep,
+) -> Response:
     """Activate user account with activation code."""
     try:
         # Note: user_id is in path but service uses code-based lookup
-        user_service.activate_account(activation_code=request.activation_code)
-        return MessageResponse(message="Account activated successfully.")
+        await run_in_threadpool(
+            user_service.activate_account, activation_code=request.activation_code
+        )
+        return Response(content=_ACTIVATED_BODY, media_type="application/json")
     except (InvalidActivationCode, ActivationCodeExpired, UserNotFound):
         # Security: Always return same generic message to prevent user enumeration
         raise HTTPException(status_code=400, detail="Invalid or expired activation code.")
@@ -105,37 +148,45 @@ def activate_user(
 
 # POST /api/v1/users/{id}/codes - Generate or resend activation code
 @router.post("/api/v1/users/{user_id}/codes", response_model=MessageResponse)
-def generate_or_resend_code(
+async def generate_or_resend_code(
     user_id: str,
     request: ResendCodeByIdRequest,
-    user_service: UserService = Depends(get_user_service),
-) -> MessageResponse:
+    user_service: UserServiceDep,
+) -> Response:
     """Generate or resend activation code to user email."""
     try:
         # RESTful: user_id in path, email in body for service compatibility
-        user_service.resend_activation_code(email=request.email)
+        await run_in_threadpool(user_service.resend_activation_code, email=request.email)
     except UserNotFound:
         # Security: Silently ignore if user doesn't exist
         pass
 
     # Security: Always return same generic message to prevent user enumeration
-    return MessageResponse(
-        message="If the email exists and account is not activated, an activation code has been sent."
-    )
+    return Response(content=_CODE_SENT_BODY, media_type="application/json")
 
 
 # GET /api/v1/users/me - Get current user profile
 @router.get("/api/v1/users/me", response_model=UserResponse)
-def get_user_me(current_user: User = Depends(get_current_user)) -> UserResponse:
-    """Get current user info using Basic Auth."""
+async def get_user_me(current_user: CurrentUserDep) -> UserResponse:
+    """Get current user info using a Bearer token or Basic Auth."""
     return UserResponse(
         id=current_user.id, email=current_user.email, is_active=current_user.is_active
     )
 
 
+# POST /api/v1/token - Exchange Basic Auth credentials for an access token
+@router.post("/api/v1/token", response_model=TokenResponse)
+async def create_token(current_user: BasicUserDep, token_service: TokenServiceDep) -> TokenResponse:
+    """Issue a short-lived Bearer token so later requests skip the bcrypt check."""
+    return TokenResponse(
+        access_token=token_service.issue(user=current_user),
+        expires_in=token_service.expiry_minutes * 60,
+    )
+
+
 # GET /api/v1/health - Health check endpoint
 @router.get("/api/v1/health")
-def health_check() -> dict[str, str | dict[str, str | dict[str, str]]]:
+async def health_check() -> dict[str, str | dict[str, str | dict[str, str]]]:
     """Complete health check endpoint with container status."""
     container_health: dict[str, str | dict[str, str]] = get_container_health()
     return {
@@ -1,19 +1,104 @@
 """Server configuration for the FastAPI application."""
 
+import asyncio
+import contextlib
+import fcntl
+import logging
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TextIO
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from src.api.errors_handler import add_error_handlers
 from src.api.routes import user_routes
+from src.config.logging import configure_logging
+from src.config.settings import get_settings
+from src.di import get_container
+from src.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# Held (flock) by the one worker per host that runs the periodic code sweep
+_CODE_CLEANUP_LOCK_PATH = os.path.join(tempfile.gettempdir(), "simple_auth-code-cleanup.lock")
+
+
+def claim_code_cleanup() -> TextIO | None:
+    """Elect this process as the host's code sweeper (non-blocking exclusive file lock).
+
+    Returns the lock file, to keep open while sweeping (closing it releases the role),
+    or None when another worker already sweeps the shared database.
+    """
+    lock_file: TextIO = open(_CODE_CLEANUP_LOCK_PATH, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+async def cleanup_expired_codes_periodically(user_service: UserService, interval: float) -> None:
+    """Delete expired activation codes every ``interval`` seconds, off the request path."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed: int = await run_in_threadpool(user_service.cleanup_expired_codes)
+        except Exception:
+            # Keep sweeping: a transient DB error must not stop the loop
+            logger.exception("Expired activation code cleanup failed")
+            continue
+        if removed:
+            logger.info("Cleaned up %d expired activation codes", removed)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Build the container before the first request and release its resources on shutdown."""
+    container = get_container()
+    container.warm_up()
+    # Bound once so request dependencies skip the container lookup
+    app.state.user_service = container.user_service()
+    app.state.token_service = container.token_service()
+
+    cleanup_task: asyncio.Task[None] | None = None
+    cleanup_lock: TextIO | None = None
+    interval: int = get_settings().code_cleanup_interval_seconds
+    if interval > 0:
+        # A shared database needs one sweeper, not one per worker; in-memory repositories
+        # are per process, so each process sweeps its own
+        if container.storage_is_shared():
+            cleanup_lock = claim_code_cleanup()
+        if cleanup_lock is not None or not container.storage_is_shared():
+            cleanup_task = asyncio.create_task(
+                cleanup_expired_codes_periodically(app.state.user_service, interval)
+            )
+    yield
+    if cleanup_task is not None:
+        cleanup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await cleanup_task
+    if cleanup_lock is not None:
+        cleanup_lock.close()
+    container.cleanup_resources()
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
+    configure_logging()
+
     # Create the FastAPI instance
     app = FastAPI(
         title="Simple Auth API",
         description="API d'authentification simple avec FastAPI",
         version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # Include the routers
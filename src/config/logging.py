@@ -0,0 +1,17 @@
+"""Logging configuration shared by the API and the command-line tasks."""
+
+import logging
+
+_logging_configured = False
+
+
+def configure_logging() -> None:
+    """Install the application's log format on the root logger (once per process)."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    # Configuration du logging
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    _logging_configured = True
@@ -2,21 +2,37 @@
 
 import os
 from dataclasses import dataclass
-from pathlib import Path
+from functools import lru_cache
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
+# Project root (src/config/settings.py -> repository root), resolved once at import
+_PROJECT_ROOT: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ENV_PATH: str = os.path.join(_PROJECT_ROOT, ".env")
 
-    # Load .env from project root
-    env_path = Path(__file__).parent.parent.parent / ".env"
-    load_dotenv(env_path)
-except ImportError:
-    # python-dotenv not installed, use system env vars only
-    pass
 
+def _usable_cpu_count() -> int:
+    """CPUs this process may run on (like `nproc`: honours CPU affinity/cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
 
-@dataclass
+
+@lru_cache(maxsize=1)
+def _load_env() -> None:
+    """Load environment variables from the project's .env file (once per process)."""
+    if not os.path.exists(_ENV_PATH):
+        # Container deploys usually rely on real env vars only
+        return
+
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(_ENV_PATH)
+    except ImportError:
+        # python-dotenv not installed, use system env vars only
+        pass
+
+
+@dataclass(frozen=True, slots=True)
 class SMTPSettings:
     """SMTP configuration for email sending."""
 
@@ -27,7 +43,7 @@ class SMTPSettings:
     use_tls: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseSettings:
     """Database configuration."""
 
@@ -36,6 +52,12 @@ class DatabaseSettings:
     name: str = "appdb"
     host: str = "db"
     port: int = 5432
+    # Connections kept open / maximum checked out at once (extra callers wait), per worker
+    # process: from_env derives the maximum from the budget shared by all workers
+    pool_min_size: int = 2
+    pool_max_size: int = 20
+    # Connections all API workers together may hold (keep it below Postgres max_connections)
+    max_connections: int = 80
 
     @property
     def url(self) -> str:
@@ -43,7 +65,7 @@ class DatabaseSettings:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AppSettings:
     """Main application settings."""
 
@@ -55,11 +77,20 @@ class AppSettings:
     # Security
     bcrypt_rounds: int = 12
     activation_code_expiry_minutes: int = 15
+    # Required (JWT_SECRET): shared by every worker so any of them accepts a token issued
+    # by another; the token service refuses to start without it
+    jwt_secret: str = ""
+    access_token_expiry_minutes: int = 15
 
     # Email
     use_mock_email: bool = True
     smtp_settings: SMTPSettings | None = None
 
+    # Background tasks (empty broker URL: emails are sent inline)
+    broker_url: str = ""
+    # Period of the in-process expired activation code sweep (0 disables it)
+    code_cleanup_interval_seconds: int = 60
+
     # Database
     database_settings: DatabaseSettings | None = None
 
@@ -67,10 +98,13 @@ class AppSettings:
     host: str = "0.0.0.0"
     port: int = 8000
     reload: bool = True
+    # One uvicorn worker per usable CPU (bcrypt is CPU-bound: more would only oversubscribe)
+    workers: int = _usable_cpu_count()
 
     @classmethod
     def from_env(cls) -> "AppSettings":
         """Create settings from environment variables."""
+        _load_env()
 
         # SMTP settings if not using mock
         smtp_settings = None
@@ -83,13 +117,22 @@ class AppSettings:
                 use_tls=cls._get_bool_env("SMTP_USE_TLS", True),
             )
 
-        # Database settings
+        # Database settings: the connection budget is split across the worker processes,
+        # so workers x pool_max_size stays within DB_MAX_CONNECTIONS
+        workers: int = int(os.getenv("WORKERS", str(_usable_cpu_count())))
+        max_connections: int = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+        pool_max_size: int = int(
+            os.getenv("DB_POOL_MAX_SIZE", str(max(1, max_connections // workers)))
+        )
         database_settings = DatabaseSettings(
             user=os.getenv("DB_USER", "app"),
             password=os.getenv("DB_PASS", "secret"),
             name=os.getenv("DB_NAME", "appdb"),
             host=os.getenv("DB_HOST", "db"),
             port=int(os.getenv("DB_PORT", "5432")),
+            pool_min_size=min(int(os.getenv("DB_POOL_MIN_SIZE", "2")), pool_max_size),
+            pool_max_size=pool_max_size,
+            max_connections=max_connections,
         )
 
         return cls(
@@ -98,12 +141,17 @@ class AppSettings:
             debug=cls._get_bool_env("DEBUG", False),
             bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
             activation_code_expiry_minutes=int(os.getenv("ACTIVATION_CODE_EXPIRY_MINUTES", "15")),
+            jwt_secret=os.getenv("JWT_SECRET", ""),
+            access_token_expiry_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRY_MINUTES", "15")),
             use_mock_email=cls._get_bool_env("USE_MOCK_EMAIL", True),
             smtp_settings=smtp_settings,
+            broker_url=os.getenv("BROKER_URL", ""),
+            code_cleanup_interval_seconds=int(os.getenv("CODE_CLEANUP_INTERVAL_SECONDS", "60")),
             database_settings=database_settings,
             host=os.getenv("HOST", "0.0.0.0"),
             port=int(os.getenv("PORT", "8000")),
             reload=cls._get_bool_env("RELOAD", True),
+            workers=workers,
         )
 
     @staticmethod
@@ -113,29 +161,12 @@ class AppSettings:
         return value in ("true", "1", "yes", "on")
 
 
-class SettingsManager:
-    """Singleton manager for application settings."""
-
-    _instance: AppSettings | None = None
-
-    @classmethod
-    def get_settings(cls) -> AppSettings:
-        """Get application settings (singleton)."""
-        if cls._instance is None:
-            cls._instance = AppSettings.from_env()
-        return cls._instance
-
-    @classmethod
-    def reset_settings(cls) -> None:
-        """Reset settings (useful for testing)."""
-        cls._instance = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> AppSettings:
-    """Get application settings (singleton)."""
-    return SettingsManager.get_settings()
+    """Get application settings (built once from the environment, then memoized)."""
+    return AppSettings.from_env()
 
 
 def reset_settings() -> None:
     """Reset settings (useful for testing)."""
-    SettingsManager.reset_settings()
+    get_settings.cache_clear()
@@ -1,27 +1,59 @@
 """Main dependency injection container."""
 
-import os
+import time
 
+from src.config.settings import AppSettings, get_settings
 from src.di.providers import InfrastructureProvider, RepositoryProvider, ServiceProvider
+from src.persistances.email_client import EmailClientInterface
 from src.persistances.repositories.interfaces import (
     ActivationCodeRepositoryInterface,
     UserRepositoryInterface,
 )
+from src.services.password_hasher import BcryptPasswordHasher
+from src.services.token_service import TokenService
 from src.services.user_service import UserService
 
+# Load balancer probes hit the health endpoint continuously; container wiring doesn't change
+_HEALTH_CHECK_TTL_SECONDS = 5.0
+
+# Shared by every healthy response; never mutate it
+_HEALTHY_STATUS: dict[str, str | dict[str, str]] = {
+    "container": "healthy",
+    "repositories": {"user_repository": "healthy", "activation_code_repository": "healthy"},
+    "services": {"user_service": "healthy"},
+    "infrastructure": {"email_client": "healthy"},
+}
+
 
 class AppContainer:
     """Main application container for dependency injection."""
 
-    def __init__(self, use_mock_email: bool = True, use_postgresql: bool = True) -> None:
-        """Initialize the container with configuration."""
+    def __init__(
+        self,
+        use_mock_email: bool = True,
+        use_postgresql: bool = True,
+        use_email_queue: bool = False,
+        password_hasher: BcryptPasswordHasher | None = None,
+        email_client: EmailClientInterface | None = None,
+    ) -> None:
+        """Initialize the container with configuration.
+
+        password_hasher and email_client replace the implementations otherwise built from
+        settings (e.g. fast fakes in tests).
+        """
         # Initialize providers in dependency order
         self._repository_provider = RepositoryProvider(use_postgresql=use_postgresql)
-        self._infrastructure_provider = InfrastructureProvider(use_mock_email=use_mock_email)
+        self._infrastructure_provider = InfrastructureProvider(
+            use_mock_email=use_mock_email,
+            use_email_queue=use_email_queue,
+            email_client=email_client,
+        )
         self._service_provider = ServiceProvider(
             repository_provider=self._repository_provider,
             infrastructure_provider=self._infrastructure_provider,
+            password_hasher=password_hasher,
         )
+        self._health_cache: tuple[float, dict[str, str | dict[str, str]]] | None = None
 
     # Repository layer access
     def user_repository(self) -> UserRepositoryInterface:
@@ -32,17 +64,34 @@ class AppContainer:
         """Get activation code repository instance."""
         return self._repository_provider.get_activation_code_repository()
 
+    def storage_is_shared(self) -> bool:
+        """Whether every worker process sees the same data (PostgreSQL, not in-memory)."""
+        return self._repository_provider.is_shared
+
     # Service layer access
     def user_service(self) -> UserService:
         """Get user service instance."""
         return self._service_provider.get_user_service()
 
+    def token_service(self) -> TokenService:
+        """Get access token service instance."""
+        return self._service_provider.get_token_service()
+
     # Infrastructure layer access
     def email_client(self):  # -> Any:
         """Get email client instance."""
         return self._infrastructure_provider.get_email_client()
 
     # Utility methods
+    def warm_up(self) -> None:
+        """Resolve all providers eagerly so the first request doesn't pay the wiring cost."""
+        self._repository_provider.open_connections()
+        self.user_repository()
+        self.activation_code_repository()
+        self.email_client()
+        self.user_service()
+        self.token_service()
+
     def cleanup_resources(self) -> None:
         """Cleanup resources (connections, etc.)."""
         # Cleanup expired activation codes
@@ -51,15 +100,22 @@ class AppContainer:
         if cleaned_count > 0:
             print(f"Cleaned up {cleaned_count} expired activation codes")
 
+        # Close the persistent SMTP session, if the email client keeps one
+        close_email_client = getattr(self.email_client(), "close", None)
+        if close_email_client is not None:
+            close_email_client()
+
+        # Close pooled database connections last: the cleanup above still queries
+        self._repository_provider.close_connections()
+
     def health_check(self) -> dict[str, str | dict[str, str]]:
-        """Perform health check on all components."""
-        health_status: dict[str, str | dict[str, str]] = {
-            "container": "healthy",
-            "repositories": {"user_repository": "healthy", "activation_code_repository": "healthy"},
-            "services": {"user_service": "healthy"},
-            "infrastructure": {"email_client": "healthy"},
-        }
+        """Perform health check on all components (cached for a few seconds)."""
+        now: float = time.monotonic()
+        cached = self._health_cache
+        if cached is not None and now - cached[0] < _HEALTH_CHECK_TTL_SECONDS:
+            return cached[1]
 
+        health_status: dict[str, str | dict[str, str]] = _HEALTHY_STATUS
         try:
             # Test repository access
             self.user_repository()
@@ -72,8 +128,9 @@ class AppContainer:
             self.email_client()
 
         except (ImportError, AttributeError, ValueError) as e:
-            health_status["container"] = f"unhealthy: {str(e)}"
+            health_status = {**_HEALTHY_STATUS, "container": f"unhealthy: {str(e)}"}
 
+        self._health_cache = (now, health_status)
         return health_status
 
 
@@ -86,9 +143,12 @@ class ContainerManager:
     def get_container(self) -> AppContainer:
         """Get the application container instance (lazy initialization)."""
         if self._container is None:
-            # Read configuration from environment
-            use_mock_email: bool = os.getenv("USE_MOCK_EMAIL", "true").lower() == "true"
-            self._container = AppContainer(use_mock_email=use_mock_email)
+            # Read configuration from environment (settings load .env first)
+            settings: AppSettings = get_settings()
+            self._container = AppContainer(
+                use_mock_email=settings.use_mock_email,
+                use_email_queue=bool(settings.broker_url),
+            )
         return self._container
 
     def reset_container(self) -> None:
@@ -1,22 +1,21 @@
 """Providers for dependency injection."""
 
-from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+import threading
+from typing import Callable, Generic, TypeVar
 
 # Infrastructure imports
 from src.config.settings import AppSettings, SMTPSettings, get_settings
-from src.persistances.email_client import EmailClientInterface, MockMailer, SMTPMailer
-
-# Repository implementations
-from src.persistances.repositories.implementations import (
-    PostgreSQLActivationCodeRepository,
-    PostgreSQLUserRepository,
-)
-from src.persistances.repositories.implementations.memory import InMemoryActivationCodeRepository
-from src.persistances.repositories.implementations.memory.user_repository import (
-    InMemoryUserRepository,
+from src.persistances.email_client import (
+    EmailClientInterface,
+    MockMailer,
+    QueuedMailer,
+    SMTPMailer,
 )
 
+# Repository implementations are imported lazily via this package (PEP 562):
+# psycopg2 only loads when a PostgreSQL repository is actually requested
+from src.persistances.repositories import implementations
+
 # Repository interfaces
 from src.persistances.repositories.interfaces import (
     ActivationCodeRepositoryInterface,
@@ -24,29 +23,32 @@ from src.persistances.repositories.interfaces import (
 )
 
 # Service imports
+from src.services.password_hasher import BcryptPasswordHasher
+from src.services.token_service import TokenService
 from src.services.user_service import UserService
 
 T = TypeVar("T")
 
 
-class Provider(ABC, Generic[T]):
-    """Base provider interface."""
-
-    @abstractmethod
-    def provide(self) -> T:
-        """Provide the dependency instance."""
-
-
-class SingletonProvider(Provider[T]):
-    """Provider that ensures singleton behavior."""
+class SingletonProvider(Generic[T]):
+    """Provider that calls its factory once and then returns the same instance."""
 
-    def __init__(self, factory_func) -> None:
+    def __init__(self, factory_func: Callable[[], T]) -> None:
         self._factory = factory_func
-        self._instance = None
+        self._instance: T | None = None
+        self._lock = threading.Lock()
 
     def provide(self) -> T:
-        if self._instance is None:
-            self._instance = self._factory()
+        # Only reached until the first instance exists; request threads may race here
+        with self._lock:
+            instance = self._instance
+            if instance is None:
+                instance = self._instance = self._factory()
+                # Shadow this method on the instance: later calls skip the lock entirely
+                self.provide = self._provide_instance
+        return instance
+
+    def _provide_instance(self) -> T:
         return self._instance
 
 
@@ -63,16 +65,35 @@ class RepositoryProvider:
     def _create_user_repository(self) -> UserRepositoryInterface:
         """Factory for user repository."""
         if self._use_postgresql:
-            return PostgreSQLUserRepository()
+            return implementations.PostgreSQLUserRepository()
         else:
-            return InMemoryUserRepository()
+            return implementations.InMemoryUserRepository()
 
     def _create_activation_code_repository(self) -> ActivationCodeRepositoryInterface:
         """Factory for activation code repository."""
         if self._use_postgresql:
-            return PostgreSQLActivationCodeRepository()
+            return implementations.PostgreSQLActivationCodeRepository()
         else:
-            return InMemoryActivationCodeRepository()
+            return implementations.InMemoryActivationCodeRepository()
+
+    @property
+    def is_shared(self) -> bool:
+        """Whether the repositories live outside this process (shared by every worker)."""
+        return self._use_postgresql
+
+    def open_connections(self) -> None:
+        """Open the database connection pool ahead of the first query."""
+        if self._use_postgresql:
+            from src.persistances.db import get_pool
+
+            get_pool()
+
+    def close_connections(self) -> None:
+        """Close the database connection pool (for shutdown)."""
+        if self._use_postgresql:
+            from src.persistances.db import close_pool
+
+            close_pool()
 
     def get_user_repository(self) -> UserRepositoryInterface:
         """Get user repository instance."""
@@ -86,12 +107,26 @@ class RepositoryProvider:
 class InfrastructureProvider:
     """Provider for infrastructure layer dependencies."""
 
-    def __init__(self, use_mock_email: bool = True) -> None:
+    def __init__(
+        self,
+        use_mock_email: bool = True,
+        use_email_queue: bool = False,
+        email_client: EmailClientInterface | None = None,
+    ) -> None:
         self._use_mock_email: bool = use_mock_email
+        self._use_email_queue: bool = use_email_queue
+        self._provided_email_client: EmailClientInterface | None = email_client
         self._email_client = SingletonProvider(self._create_email_client)
 
     def _create_email_client(self) -> EmailClientInterface:
         """Factory for email client."""
+        if self._provided_email_client is not None:
+            return self._provided_email_client
+        if self._use_email_queue:
+            # Celery is only needed when a broker is configured
+            from src.tasks.email_tasks import send_activation_email
+
+            return QueuedMailer(enqueue=send_activation_email.delay)
         if self._use_mock_email:
             return MockMailer()
         # SMTP configuration via settings (allows using MailHog or real SMTP)
@@ -121,10 +156,13 @@ class ServiceProvider:
         self,
         repository_provider: RepositoryProvider,
         infrastructure_provider: InfrastructureProvider,
+        password_hasher: BcryptPasswordHasher | None = None,
     ) -> None:
         self._repository_provider: RepositoryProvider = repository_provider
         self._infrastructure_provider: InfrastructureProvider = infrastructure_provider
+        self._password_hasher: BcryptPasswordHasher | None = password_hasher
         self._user_service = SingletonProvider(self._create_user_service)
+        self._token_service = SingletonProvider(self._create_token_service)
 
     def _create_user_service(self) -> UserService:
         """Factory for user service."""
@@ -132,8 +170,29 @@ class ServiceProvider:
             user_repo=self._repository_provider.get_user_repository(),
             activation_repo=self._repository_provider.get_activation_code_repository(),
             mailer=self._infrastructure_provider.get_email_client(),
+            password_hasher=self._password_hasher or self._create_password_hasher(),
         )
 
+    def _create_password_hasher(self) -> BcryptPasswordHasher:
+        """Factory for the bcrypt hasher (cost from settings)."""
+        return BcryptPasswordHasher(rounds=get_settings().bcrypt_rounds)
+
     def get_user_service(self) -> UserService:
         """Get user service instance."""
         return self._user_service.provide()
+
+    def _create_token_service(self) -> TokenService:
+        """Factory for access token service."""
+        settings: AppSettings = get_settings()
+        if not settings.jwt_secret:
+            # A per-process fallback secret would make each worker reject the others' tokens
+            raise ValueError(
+                "JWT_SECRET is not configured. Set it to a shared random value (e.g. the output of `python -c 'import secrets; print(secrets.token_urlsafe(32))'`)."
+            )
+        return TokenService(
+            secret=settings.jwt_secret, expiry_minutes=settings.access_token_expiry_minutes
+        )
+
+    def get_token_service(self) -> TokenService:
+        """Get access token service instance."""
+        return self._token_service.provide()
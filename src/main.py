@@ -1,14 +1,12 @@
 """Main entry point for the FastAPI application."""
 
-import logging
+from __future__ import annotations
 
-from fastapi import FastAPI
+from typing import TYPE_CHECKING
 
 from src.api.server import create_app
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 app: FastAPI = create_app()
@@ -3,22 +3,21 @@
 import os
 import threading
 from contextlib import contextmanager
+from functools import lru_cache
 
-import psycopg2
-from psycopg2 import extras, pool
+from src.config.settings import DatabaseSettings, get_settings
 
-from src.config.settings import get_settings
+# psycopg2 (and libpq) is imported when the pool is first built, not at module import
 
 
-def get_database_url() -> str:
-    """Get database URL from centralized application settings."""
+@lru_cache(maxsize=1)
+def get_database_settings() -> DatabaseSettings:
+    """Get database settings from centralized application settings (resolved once)."""
     settings = get_settings()
     db = settings.database_settings
     # db is populated in AppSettings.from_env, but add a safe fallback
     if db is None:
         # Late load from env to avoid None
-        from src.config.settings import DatabaseSettings
-
         db = DatabaseSettings(
             user=os.getenv("DB_USER", "app"),
             password=os.getenv("DB_PASS", "secret"),
@@ -26,7 +25,13 @@ def get_database_url() -> str:
             host=os.getenv("DB_HOST", "db"),
             port=int(os.getenv("DB_PORT", "5432")),
         )
-    return db.url
+    return db
+
+
+@lru_cache(maxsize=1)
+def get_database_url() -> str:
+    """Get database URL from centralized application settings (computed once)."""
+    return get_database_settings().url
 
 
 class SimpleConnectionPool:
@@ -48,36 +53,102 @@ class SimpleConnectionPool:
         if hasattr(self, "_pool"):
             return  # Already initialized
 
-        try:
-            self._pool = pool.ThreadedConnectionPool(
-                minconn=1,  # Minimum: 1 connection
-                maxconn=5,  # Maximum: 5 connections (sufficient for testing)
-                dsn=get_database_url(),
-                cursor_factory=extras.RealDictCursor,
-            )
-        except psycopg2.Error as e:
-            raise RuntimeError(f"Failed to create connection pool: {e}") from e
+        with self._lock:
+            # Re-check: another thread may have built the pool while we waited
+            if hasattr(self, "_pool"):
+                return
+
+            import psycopg2
+            from psycopg2 import extensions, extras, pool
+
+            class PreparingConnection(extensions.connection):
+                """Connection remembering which statements were PREPAREd in its session."""
+
+                def __init__(self, *args, **kwargs) -> None:
+                    super().__init__(*args, **kwargs)
+                    self.prepared_statements: set[str] = set()
+
+            db: DatabaseSettings = get_database_settings()
+            # ThreadedConnectionPool raises once maxconn is reached; make callers wait instead
+            self._available = threading.BoundedSemaphore(value=db.pool_max_size)
+            try:
+                self._pool = pool.ThreadedConnectionPool(
+                    minconn=db.pool_min_size,
+                    maxconn=db.pool_max_size,
+                    dsn=get_database_url(),
+                    # Sessions in UTC: timestamptz values come back as aware UTC datetimes
+                    options="-c timezone=UTC",
+                    connection_factory=PreparingConnection,
+                    cursor_factory=extras.RealDictCursor,
+                )
+            except psycopg2.Error as e:
+                raise RuntimeError(f"Failed to create connection pool: {e}") from e
 
     def get_connection(self):
-        """Get a connection from the pool."""
-        return self._pool.getconn()
+        """Get a connection from the pool (blocks while all connections are in use)."""
+        self._available.acquire()
+        try:
+            return self._pool.getconn()
+        except BaseException:
+            self._available.release()
+            raise
 
     def put_connection(self, conn) -> None:
         """Return a connection to the pool."""
-        self._pool.putconn(conn=conn)
+        try:
+            self._pool.putconn(conn=conn)
+        finally:
+            self._available.release()
 
     def close_all(self) -> None:
-        """Close all connections (for shutdown)."""
-        if hasattr(self, "_pool"):
-            self._pool.closeall()
+        """Close all connections (for shutdown); the next instantiation builds a new pool."""
+        with self._lock:
+            if hasattr(self, "_pool"):
+                self._pool.closeall()
+                del self._pool
+            if SimpleConnectionPool._instance is self:
+                SimpleConnectionPool._instance = None
+
 
+_pool: SimpleConnectionPool | None = None
 
-# No need for extra layer - SimpleConnectionPool is already a singleton
+
+def get_pool() -> SimpleConnectionPool:
+    """Return the process-wide pool, building it on first use."""
+    global _pool
+    if _pool is None:
+        # SimpleConnectionPool is a locked singleton, so racing callers get the same pool
+        _pool = SimpleConnectionPool()
+    return _pool
+
+
+def close_pool() -> None:
+    """Close every pooled connection (for shutdown); a later get_pool() reopens one."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.close_all()
+
+
+def execute_prepared(cursor, name: str, query: str, params: tuple) -> None:
+    """Execute a hot query as a server-side prepared statement.
+
+    The statement is PREPAREd once per pooled connection (query uses $1..$n
+    placeholders); every later call only sends EXECUTE, skipping parse/plan.
+    """
+    prepared_statements: set[str] = cursor.connection.prepared_statements
+    if name not in prepared_statements:
+        cursor.execute(f"PREPARE {name} AS {query}")
+        # Session-level: survives COMMIT/ROLLBACK until the connection closes
+        prepared_statements.add(name)
+
+    placeholders: str = ", ".join(["%s"] * len(params))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", params)
 
 
 @contextmanager
 def get_db_cursor():  # -> Generator[Any, Any, None]:
-    """Get a database cursor with connection pooling.
+    """Get a database cursor with connection pooling (each block is its own transaction).
 
     Usage:
         with get_db_cursor() as cursor:
@@ -85,13 +156,12 @@ def get_db_cursor():  # -> Generator[Any, Any, None]:
             results = cursor.fetchall()  # Returns list of dicts
     """
     conn = None
-    pool = SimpleConnectionPool()  # Singleton - always returns the same instance
+    pool: SimpleConnectionPool = get_pool()
     try:
         # Get connection from pool (singleton)
         conn = pool.get_connection()
-        cursor = conn.cursor()
-
-        yield cursor
+        with conn.cursor() as cursor:
+            yield cursor
 
         # Auto-commit successful operations
         conn.commit()
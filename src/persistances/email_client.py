@@ -2,9 +2,9 @@
 
 import logging
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import Protocol
+import threading
+from email.message import EmailMessage
+from typing import Callable, Protocol
 
 logger: logging.Logger = logging.getLogger(name=__name__)
 
@@ -36,10 +36,35 @@ class MockMailer:
         return True
 
 
+# Activation email content, formatted with the code on each send
+_ACTIVATION_SUBJECT = "Activation de votre compte"
+_ACTIVATION_TEXT_TEMPLATE = """Bonjour,
+
+Votre code d'activation est : {code}
+
+Ce code expire dans 15 minutes.
+
+Cordialement,
+L'équipe Simple Auth
+"""
+_ACTIVATION_HTML_TEMPLATE = """<html>
+  <body>
+    <h2>Activation de votre compte</h2>
+    <p>Bonjour,</p>
+    <p>Votre code d'activation est : <strong>{code}</strong></p>
+    <p>Ce code expire dans 15 minutes.</p>
+    <p>Cordialement,<br>L'équipe Simple Auth</p>
+  </body>
+</html>
+"""
+
+
 class SMTPMailer:
     """SMTP email client for production use.
 
-    Supports optional TLS and optional AUTH (for tools like MailHog).
+    Supports optional TLS and optional AUTH (for tools like MailHog). The SMTP
+    session is opened once and reused across emails; it is checked with NOOP
+    before each send and reopened if the server dropped it.
     """
 
     def __init__(
@@ -55,61 +80,81 @@ class SMTPMailer:
         self.username: str = username
         self.password: str = password
         self.use_tls: bool = use_tls
+        # Use username as sender, or default for MailHog if username is empty
+        self._sender: str = username if username else "noreply@simpleauth.local"
+        self._smtp: smtplib.SMTP | None = None
+        self._smtp_lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open an SMTP session (TCP + optional TLS + optional AUTH)."""
+        server = smtplib.SMTP(host=self.smtp_server, port=self.smtp_port)
+        try:
+            # Optional TLS (MailHog typically doesn't support TLS)
+            if self.use_tls:
+                try:
+                    server.starttls()
+                except smtplib.SMTPException:
+                    # If TLS fails (e.g., MailHog), continue without TLS
+                    pass
+            # Optional AUTH (MailHog doesn't require auth)
+            if self.username and self.password:
+                server.login(user=self.username, password=self.password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    def _get_server(self) -> smtplib.SMTP:
+        """Return the live SMTP session, reconnecting if it went away (lock held)."""
+        if self._smtp is not None:
+            try:
+                status, _ = self._smtp.noop()
+                if status == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp.close()
+            self._smtp = None
+
+        self._smtp = self._connect()
+        return self._smtp
+
+    def close(self) -> None:
+        """Close the persistent SMTP session (for shutdown)."""
+        with self._smtp_lock:
+            if self._smtp is None:
+                return
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
 
     def send_activation_email(self, to_email: str, activation_code: str) -> bool:
         """Send activation email using SMTP."""
         try:
 
-            # Create message
-            message = MIMEMultipart(_subtype="alternative")
-            message["Subject"] = "Activation de votre compte"
-            # Use username as sender, or default for MailHog if username is empty
-            message["From"] = self.username if self.username else "noreply@simpleauth.local"
+            # Only the recipient and the code vary between emails
+            message = EmailMessage()
+            message["Subject"] = _ACTIVATION_SUBJECT
+            message["From"] = self._sender
             message["To"] = to_email
-
-            # Create email content
-            text_content: str = f"""
-            Bonjour,
-
-            Votre code d'activation est : {activation_code}
-
-            Ce code expire dans 15 minutes.
-
-            Cordialement,
-            L'équipe Simple Auth
-            """
-
-            html_content: str = f"""
-            <html>
-              <body>
-                <h2>Activation de votre compte</h2>
-                <p>Bonjour,</p>
-                <p>Votre code d'activation est : <strong>{activation_code}</strong></p>
-                <p>Ce code expire dans 15 minutes.</p>
-                <p>Cordialement,<br>L'équipe Simple Auth</p>
-              </body>
-            </html>
-            """
-
-            # Attach parts
-            part1 = MIMEText(_text=text_content, _subtype="plain")
-            part2 = MIMEText(_text=html_content, _subtype="html")
-            message.attach(payload=part1)
-            message.attach(payload=part2)
-
-            # Send email
-            with smtplib.SMTP(host=self.smtp_server, port=self.smtp_port) as server:
-                # Optional TLS (MailHog typically doesn't support TLS)
-                if self.use_tls:
-                    try:
-                        server.starttls()
-                    except smtplib.SMTPException:
-                        # If TLS fails (e.g., MailHog), continue without TLS
-                        pass
-                # Optional AUTH (MailHog doesn't require auth)
-                if self.username and self.password:
-                    server.login(user=self.username, password=self.password)
-                server.send_message(msg=message)
+            # multipart/alternative: plain text first, HTML preferred by capable clients
+            message.set_content(_ACTIVATION_TEXT_TEMPLATE.format(code=activation_code))
+            message.add_alternative(
+                _ACTIVATION_HTML_TEMPLATE.format(code=activation_code), subtype="html"
+            )
+
+            # smtplib sessions are not thread-safe: one send at a time per mailer
+            with self._smtp_lock:
+                try:
+                    self._get_server().send_message(msg=message)
+                except smtplib.SMTPServerDisconnected:
+                    # Dropped between NOOP and send: close it, retry once on a fresh session
+                    if self._smtp is not None:
+                        self._smtp.close()
+                        self._smtp = None
+                    self._get_server().send_message(msg=message)
 
             logger.info("Activation email sent successfully to %s", to_email)
             return True
@@ -119,5 +164,22 @@ class SMTPMailer:
             return False
 
 
+class QueuedMailer:
+    """Email client that hands activation emails to a background task queue.
+
+    The actual delivery happens in a worker process, so the caller only pays
+    for enqueueing the message.
+    """
+
+    def __init__(self, enqueue: Callable[[str, str], object]) -> None:
+        self._enqueue: Callable[[str, str], object] = enqueue
+
+    def send_activation_email(self, to_email: str, activation_code: str) -> bool:
+        """Enqueue the activation email for asynchronous delivery."""
+        self._enqueue(to_email, activation_code)
+        logger.info("Activation email to %s queued for delivery", to_email)
+        return True
+
+
 # Default mailer instance for development
 Mailer = MockMailer
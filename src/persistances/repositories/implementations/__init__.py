@@ -1,16 +1,33 @@
-"""Repository implementations package."""
+"""Repository implementations package.
 
-# PostgreSQL implementations (production)
-# In-memory implementations (testing/demo)
-from .memory import InMemoryActivationCodeRepository, InMemoryUserRepository
-from .postgresql_activation_code_repository import PostgreSQLActivationCodeRepository
-from .postgresql_user_repository import PostgreSQLUserRepository
+Implementations are loaded on first attribute access (PEP 562), so an
+in-memory deployment never imports psycopg2 and vice versa.
+"""
 
-__all__ = [
+from importlib import import_module
+
+# Exported name -> submodule defining it
+_LAZY_IMPORTS: dict[str, str] = {
     # PostgreSQL (production)
-    "PostgreSQLUserRepository",
-    "PostgreSQLActivationCodeRepository",
+    "PostgreSQLUserRepository": ".postgresql_user_repository",
+    "PostgreSQLActivationCodeRepository": ".postgresql_activation_code_repository",
     # In-memory (testing/demo)
-    "InMemoryUserRepository",
-    "InMemoryActivationCodeRepository",
-]
+    "InMemoryUserRepository": ".memory",
+    "InMemoryActivationCodeRepository": ".memory",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    module_name: str | None = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
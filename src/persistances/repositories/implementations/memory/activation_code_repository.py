@@ -1,11 +1,17 @@
 """In-memory implementation of ActivationCodeRepository for testing/demo purposes."""
 
 import random
-import string
+import threading
 
 from src.persistances.repositories.interfaces import ActivationCodeRepositoryInterface
 from src.services.models import ActivationCode
 
+# OS-backed RNG (activation codes must not be predictable), bound once for the hot path
+_randrange = random.SystemRandom().randrange
+
+# The whole 4-digit code space, formatted once; each repository starts from a copy
+_ALL_CODES: tuple[str, ...] = tuple(f"{i:04d}" for i in range(10000))
+
 
 class InMemoryActivationCodeRepository(ActivationCodeRepositoryInterface):
     """In-memory implementation of ActivationCodeRepository for testing/demo."""
@@ -13,23 +19,47 @@ class InMemoryActivationCodeRepository(ActivationCodeRepositoryInterface):
     def __init__(self) -> None:
         self._codes: dict[str, ActivationCode] = {}  # user_id -> ActivationCode
         self._code_index: dict[str, str] = {}  # code -> user_id
+        # Every 4-digit code not currently assigned; taken at a random index, given back on release
+        self._free_codes: list[str] = list(_ALL_CODES)
+        # Request threads and the periodic sweep (threadpool) mutate the three structures
+        # together: one lock keeps them consistent (no code handed out twice or lost)
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Remove every code and release the whole code space (e.g. between tests)."""
+        with self._lock:
+            self._codes.clear()
+            self._code_index.clear()
+            self._free_codes = list(_ALL_CODES)
+
+    def _take_free_code(self) -> str:
+        """Remove and return a random unassigned code in O(1) (swap with last, then pop).
+
+        Called with the lock held.
+        """
+        free_codes: list[str] = self._free_codes
+        if not free_codes:
+            raise ValueError("Could not generate unique activation code")
+        index: int = _randrange(len(free_codes))
+        free_codes[index], free_codes[-1] = free_codes[-1], free_codes[index]
+        return free_codes.pop()
 
     def create(self, user_id: str) -> ActivationCode:
         """Create a new 4-digit activation code for a user."""
-        # Supprimer l'ancien code si il existe
-        self.delete(user_id=user_id)
-
-        # Générer un code à 4 chiffres
-        code: str = "".join(random.choices(population=string.digits, k=4))
+        with self._lock:
+            # Générer un code à 4 chiffres, unique par construction
+            code: str = self._take_free_code()
 
-        # S'assurer que le code est unique
-        while code in self._code_index:
-            code = "".join(random.choices(population=string.digits, k=4))
+            # Supprimer l'ancien code si il existe (un seul pop, sans appel à delete)
+            prior: ActivationCode | None = self._codes.pop(user_id, None)
+            if prior is not None:
+                del self._code_index[prior.code]
+                self._free_codes.append(prior.code)
 
-        activation_code = ActivationCode(user_id=user_id, code=code)
+            activation_code = ActivationCode(user_id=user_id, code=code)
 
-        self._codes[user_id] = activation_code
-        self._code_index[code] = user_id
+            self._codes[user_id] = activation_code
+            self._code_index[code] = user_id
 
         return activation_code
 
@@ -39,29 +69,36 @@ class InMemoryActivationCodeRepository(ActivationCodeRepositoryInterface):
 
     def get_by_code(self, code: str) -> ActivationCode | None:
         """Get activation code by code value."""
-        user_id: str | None = self._code_index.get(code)
-        if user_id:
-            return self._codes.get(user_id)
+        with self._lock:
+            user_id: str | None = self._code_index.get(code)
+            if user_id:
+                return self._codes.get(user_id)
         return None
 
     def delete(self, user_id: str) -> bool:
         """Delete activation code for a user."""
-        if user_id in self._codes:
-            activation_code: ActivationCode = self._codes[user_id]
+        with self._lock:
+            activation_code: ActivationCode | None = self._codes.pop(user_id, None)
+            if activation_code is None:
+                return False
             del self._code_index[activation_code.code]
-            del self._codes[user_id]
-            return True
-        return False
+            self._free_codes.append(activation_code.code)
+        return True
 
     def cleanup_expired(self) -> int:
         """Remove expired activation codes."""
-        expired_users: list[str] = []
-
-        for user_id, activation_code in self._codes.items():
-            if activation_code.is_expired:
-                expired_users.append(user_id)
-
-        for user_id in expired_users:
-            self.delete(user_id=user_id)
-
-        return len(expired_users)
+        with self._lock:
+            # Single sweep: rebuild both indexes from the live codes
+            live: dict[str, ActivationCode] = {}
+            for user_id, activation_code in self._codes.items():
+                if activation_code.is_expired:
+                    self._free_codes.append(activation_code.code)
+                else:
+                    live[user_id] = activation_code
+            expired_count: int = len(self._codes) - len(live)
+            if expired_count:
+                self._codes = live
+                self._code_index = {
+                    activation_code.code: user_id for user_id, activation_code in live.items()
+                }
+        return expired_count
@@ -1,5 +1,8 @@
 """In-memory implementation of UserRepository for testing/demo purposes."""
 
+import uuid
+from itertools import islice
+
 from src.persistances.repositories.interfaces import UserRepositoryInterface
 from src.services.models import User
 
@@ -9,67 +12,79 @@ class InMemoryUserRepository(UserRepositoryInterface):
 
     def __init__(self) -> None:
         self._users: dict[str, User] = {}  # user_id -> User
-        self._email_index: dict[str, str] = {}  # email -> user_id
+        self._users_by_email: dict[str, User] = {}  # email -> User (same objects)
+
+    def clear(self) -> None:
+        """Remove every user (resets the repository, e.g. between tests)."""
+        self._users.clear()
+        self._users_by_email.clear()
 
     def create(self, user: User) -> User:
         """Create a new user."""
-        if user.id in self._users:
+        if user.id is None:
+            # Same textual form as the ids PostgreSQL generates
+            user.id = str(uuid.uuid4())
+        elif user.id in self._users:
             raise ValueError(f"User with ID {user.id} already exists")
 
-        if user.email in self._email_index:
+        if user.email in self._users_by_email:
             raise ValueError(f"User with email {user.email} already exists")
 
         self._users[user.id] = user
-        self._email_index[user.email] = user.id
+        self._users_by_email[user.email] = user
         return user
 
+    def create_if_absent(self, user: User) -> User | None:
+        """Create a new user unless the email is taken."""
+        if user.email in self._users_by_email:
+            return None
+        return self.create(user=user)
+
     def get_by_id(self, user_id: str) -> User | None:
         """Get user by ID."""
         return self._users.get(user_id)
 
     def get_by_email(self, email: str) -> User | None:
         """Get user by email."""
-        user_id: str | None = self._email_index.get(email)
-        return self._users.get(user_id) if user_id else None
+        return self._users_by_email.get(email)
 
     def update(self, user: User) -> User:
         """Update an existing user."""
         if user.id not in self._users:
             raise ValueError(f"User with ID {user.id} not found")
 
-        # Update email index if email changed
+        # Drop the old email entry if email changed, then rebind both indexes
         old_user: User = self._users[user.id]
         if old_user.email != user.email:
-            del self._email_index[old_user.email]
-            self._email_index[user.email] = user.id
+            del self._users_by_email[old_user.email]
 
         self._users[user.id] = user
+        self._users_by_email[user.email] = user
         return user
 
     def delete(self, user_id: str) -> bool:
         """Delete a user by ID."""
-        if user_id in self._users:
-            user: User = self._users[user_id]
-            del self._email_index[user.email]
-            del self._users[user_id]
-            return True
-        return False
+        user: User | None = self._users.pop(user_id, None)
+        if user is None:
+            return False
+        del self._users_by_email[user.email]
+        return True
 
     def list_all(self, limit: int = 100, offset: int = 0) -> list[User]:
         """List all users with pagination."""
-        users: list[User] = list(self._users.values())
-        return users[offset : offset + limit]
+        # Walk only offset + limit entries instead of copying every user
+        return list(islice(self._users.values(), offset, offset + limit))
 
     def exists_by_email(self, email: str) -> bool:
         """Check if user exists by email."""
-        return email in self._email_index
+        return email in self._users_by_email
 
     def activate_user(self, user_id: str) -> bool:
         """Activate a user account."""
-        user: User | None = self.get_by_id(user_id=user_id)
+        user: User | None = self._users.get(user_id)
         if not user:
             return False
 
+        # Both indexes hold the same object, so mutating it updates them in place
         user.is_active = True
-        self.update(user=user)
         return True
@@ -2,35 +2,56 @@
 
 import logging
 import random
-import string
 
-from src.persistances.db import get_db_cursor
+from src.persistances.db import execute_prepared, get_db_cursor
 from src.persistances.repositories.interfaces import ActivationCodeRepositoryInterface
 from src.services.models import ActivationCode
 
 logger = logging.getLogger(__name__)
 
+# Only the columns mapped onto ActivationCode: psycopg2 parses every returned value from text
+_CODE_COLUMNS = "user_id, code, created_at, expires_at"
+
+# OS-backed RNG (activation codes must not be predictable), bound once for the hot path
+_randrange = random.SystemRandom().randrange
+
 
 class PostgreSQLActivationCodeRepository(ActivationCodeRepositoryInterface):
-    """PostgreSQL implementation of ActivationCodeRepository."""
+    """PostgreSQL implementation of ActivationCodeRepository.
+
+    The hot statements run as prepared statements (see execute_prepared), so
+    they are parsed and planned once per pooled connection.
+    """
+
+    max_code_attempts = 10
 
     def create(self, user_id: str) -> ActivationCode:
         """Create a new 4-digit activation code for a user."""
-        # Delete existing code first
-        self.delete(user_id)
+        from psycopg2.errors import UniqueViolation
 
-        # Generate unique 4-digit code
-        code = self._generate_unique_code()
-
-        query = """
+        # UNIQUE(user_id): replace any previous code in the same statement.
+        # UNIQUE(code): the database rejects a code already held by another user.
+        query = f"""
             INSERT INTO activation_codes (user_id, code, created_at, expires_at)
-            VALUES (%s, %s, NOW(), NOW() + INTERVAL '1 minute')
-            RETURNING *
+            VALUES ($1, $2, NOW(), NOW() + INTERVAL '1 minute')
+            ON CONFLICT (user_id) DO UPDATE
+            SET code = EXCLUDED.code,
+                created_at = EXCLUDED.created_at,
+                expires_at = EXCLUDED.expires_at,
+                used_at = NULL
+            RETURNING {_CODE_COLUMNS}
         """
 
-        with get_db_cursor() as cursor:
-            cursor.execute(query, (user_id, code))
-            row = cursor.fetchone()
+        for _ in range(self.max_code_attempts):
+            code = f"{_randrange(10000):04d}"
+            try:
+                with get_db_cursor() as cursor:
+                    execute_prepared(cursor, "activation_code_upsert", query, (user_id, code))
+                    row = cursor.fetchone()
+            except UniqueViolation:
+                # Code collision: the statement was undone, draw another one
+                logger.debug("Activation code collision, retrying")
+                continue
 
             return ActivationCode(
                 user_id=row["user_id"],
@@ -39,17 +60,20 @@ class PostgreSQLActivationCodeRepository(ActivationCodeRepositoryInterface):
                 expires_at=row["expires_at"],
             )
 
+        # If we can't find unique code after max_code_attempts, raise error
+        raise ValueError("Could not generate unique activation code")
+
     def get_by_user_id(self, user_id: str) -> ActivationCode | None:
         """Get the latest activation code for a user."""
-        query = """
-            SELECT * FROM activation_codes
-            WHERE user_id = %s
+        query = f"""
+            SELECT {_CODE_COLUMNS} FROM activation_codes
+            WHERE user_id = $1
             ORDER BY created_at DESC
             LIMIT 1
         """
 
         with get_db_cursor() as cursor:
-            cursor.execute(query, (user_id,))
+            execute_prepared(cursor, "activation_code_by_user", query, (user_id,))
             row = cursor.fetchone()
 
             if row:
@@ -63,10 +87,10 @@ class PostgreSQLActivationCodeRepository(ActivationCodeRepositoryInterface):
 
     def get_by_code(self, code: str) -> ActivationCode | None:
         """Get activation code by code value."""
-        query = "SELECT * FROM activation_codes WHERE code = %s"
+        query = f"SELECT {_CODE_COLUMNS} FROM activation_codes WHERE code = $1"
 
         with get_db_cursor() as cursor:
-            cursor.execute(query, (code,))
+            execute_prepared(cursor, "activation_code_by_code", query, (code,))
             row = cursor.fetchone()
 
             if row:
@@ -80,10 +104,10 @@ class PostgreSQLActivationCodeRepository(ActivationCodeRepositoryInterface):
 
     def delete(self, user_id: str) -> bool:
         """Delete activation codes for a user."""
-        query = "DELETE FROM activation_codes WHERE user_id = %s"
+        query = "DELETE FROM activation_codes WHERE user_id = $1"
 
         with get_db_cursor() as cursor:
-            cursor.execute(query, (user_id,))
+            execute_prepared(cursor, "activation_code_delete", query, (user_id,))
             return cursor.rowcount > 0
 
     def cleanup_expired(self) -> int:
@@ -93,20 +117,3 @@ class PostgreSQLActivationCodeRepository(ActivationCodeRepositoryInterface):
         with get_db_cursor() as cursor:
             cursor.execute(query)
             return cursor.rowcount
-
-    def _generate_unique_code(self) -> str:
-        """Generate a unique 4-digit code."""
-        max_attempts = 10
-
-        for _ in range(max_attempts):
-            code = "".join(random.choices(string.digits, k=4))
-
-            # Check if code already exists
-            query = "SELECT 1 FROM activation_codes WHERE code = %s"
-            with get_db_cursor() as cursor:
-                cursor.execute(query, (code,))
-                if not cursor.fetchone():
-                    return code
-
-        # If we can't find unique code after max_attempts, raise error
-        raise ValueError("Could not generate unique activation code")
@@ -1,98 +1,186 @@
 """Simple PostgreSQL User Repository - just what we need."""
 
 import logging
+import random
 
-from src.persistances.db import get_db_cursor
-from src.persistances.repositories.interfaces import UserRepositoryInterface
-from src.services.models import User
+from src.persistances.db import execute_prepared, get_db_cursor
+from src.persistances.repositories.interfaces import (
+    ActivationCodeRepositoryInterface,
+    UserRepositoryInterface,
+)
+from src.services.models import ActivationCode, User
 
 logger = logging.getLogger(__name__)
 
+# OS-backed RNG for activation codes (same draw as the activation code repository)
+_randrange = random.SystemRandom().randrange
+
+# Selected/returned columns, named and ordered like the User fields (updated_at is not mapped)
+_USER_FIELDS: tuple[str, ...] = ("email", "password_hash", "id", "is_active", "created_at")
+_USER_COLUMNS = ", ".join(_USER_FIELDS)
+
+# Unique index whose violations mean "activation code already taken" (see schema.sql)
+_ACTIVATION_CODE_INDEX = "idx_activation_codes_code"
+
+
+def _row_to_user(row) -> User | None:
+    """Build a User from a RealDictCursor row selecting (at least) _USER_COLUMNS."""
+    return User(*[row[name] for name in _USER_FIELDS]) if row else None
+
 
 class PostgreSQLUserRepository(UserRepositoryInterface):
-    """Simple PostgreSQL implementation."""
+    """Simple PostgreSQL implementation.
+
+    The statements hit on every signup/login run as prepared statements (see
+    execute_prepared): parsed and planned once per pooled connection.
+    """
+
+    # Rows fetched per round-trip when streaming large list_all pages
+    list_page_size = 500
+    # Activation code draws before giving up on a 4-digit collision
+    max_code_attempts = 10
+
+    # A User without id gets one generated by PostgreSQL
+    _CREATE_SQL = f"""
+        INSERT INTO users (id, email, password_hash, is_active, created_at)
+        VALUES (COALESCE($1::uuid, gen_random_uuid()), $2, $3, $4, $5)
+        RETURNING {_USER_COLUMNS}
+    """
+    _CREATE_IF_ABSENT_SQL = f"""
+        INSERT INTO users (id, email, password_hash, is_active, created_at)
+        VALUES (COALESCE($1::uuid, gen_random_uuid()), $2, $3, $4, $5)
+        ON CONFLICT ((lower(email))) DO NOTHING
+        RETURNING {_USER_COLUMNS}
+    """
+    # User insert and first activation code insert in one statement (nothing if email taken,
+    # in any case: the arbiter is idx_users_email_lower, which also covers exact duplicates)
+    _CREATE_WITH_CODE_SQL = f"""
+        WITH u AS (
+            INSERT INTO users (id, email, password_hash, is_active, created_at)
+            VALUES (COALESCE($1::uuid, gen_random_uuid()), $2, $3, $4, $5)
+            ON CONFLICT ((lower(email))) DO NOTHING
+            RETURNING {_USER_COLUMNS}
+        ),
+        c AS (
+            INSERT INTO activation_codes (user_id, code, created_at, expires_at)
+            SELECT id, $6, NOW(), NOW() + INTERVAL '1 minute' FROM u
+            RETURNING code, created_at AS code_created_at, expires_at
+        )
+        SELECT u.*, c.* FROM u CROSS JOIN c
+    """
+    # Callers pass normalized (lowercased) emails; lower(email) matches rows stored with
+    # another case before normalization and is served by idx_users_email_lower
+    _GET_BY_EMAIL_SQL = f"SELECT {_USER_COLUMNS} FROM users WHERE lower(email) = $1"
+    _GET_BY_ID_SQL = f"SELECT {_USER_COLUMNS} FROM users WHERE id = $1"
+    _EXISTS_BY_EMAIL_SQL = (
+        "SELECT EXISTS (SELECT 1 FROM users WHERE lower(email) = $1) AS user_exists"
+    )
+    _ACTIVATE_SQL = "UPDATE users SET is_active = true WHERE id = $1"
+    # Lookup + expiry check (server clock) + activation + code deletion in one statement
+    _ACTIVATE_WITH_CODE_SQL = f"""
+        WITH c AS (
+            SELECT user_id FROM activation_codes WHERE code = $1 AND expires_at > NOW()
+        ),
+        d AS (
+            DELETE FROM activation_codes WHERE user_id IN (SELECT user_id FROM c)
+        )
+        UPDATE users SET is_active = true
+        FROM c
+        WHERE users.id = c.user_id
+        RETURNING {_USER_COLUMNS}
+    """
 
     def create(self, user: User) -> User:
         """Create a new user."""
-        query = """
-            INSERT INTO users (id, email, password_hash, is_active, created_at)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING *
-        """
+        with get_db_cursor() as cursor:
+            execute_prepared(
+                cursor,
+                "user_create",
+                self._CREATE_SQL,
+                (user.id, user.email, user.password_hash, user.is_active, user.created_at),
+            )
+            return _row_to_user(cursor.fetchone())
 
+    def create_if_absent(self, user: User) -> User | None:
+        """Create a new user, or return None if the email is taken (one round-trip, no race)."""
         with get_db_cursor() as cursor:
-            cursor.execute(
-                query, (user.id, user.email, user.password_hash, user.is_active, user.created_at)
+            execute_prepared(
+                cursor,
+                "user_create_if_absent",
+                self._CREATE_IF_ABSENT_SQL,
+                (user.id, user.email, user.password_hash, user.is_active, user.created_at),
             )
-            row = cursor.fetchone()
-
-            return User(
-                id=row["id"],
-                email=row["email"],
-                password_hash=row["password_hash"],
-                is_active=row["is_active"],
-                created_at=row["created_at"],
+            return _row_to_user(cursor.fetchone())
+
+    def create_with_activation_code(
+        self, user: User, activation_repo: ActivationCodeRepositoryInterface
+    ) -> tuple[User, ActivationCode] | None:
+        """Create a user and its activation code in one round-trip (None if email taken)."""
+        from psycopg2.errors import UniqueViolation
+
+        params = (user.id, user.email, user.password_hash, user.is_active, user.created_at)
+
+        for _ in range(self.max_code_attempts):
+            code = f"{_randrange(10000):04d}"
+            try:
+                with get_db_cursor() as cursor:
+                    execute_prepared(
+                        cursor,
+                        "user_create_with_code",
+                        self._CREATE_WITH_CODE_SQL,
+                        (*params, code),
+                    )
+                    row = cursor.fetchone()
+            except UniqueViolation as e:
+                # Any other unique violation is a real error, not something a redraw fixes
+                if e.diag.constraint_name != _ACTIVATION_CODE_INDEX:
+                    raise
+                # Code already held by another user: the whole statement was undone, redraw
+                logger.debug("Activation code collision, retrying")
+                continue
+
+            if row is None:
+                return None
+            created_user: User = _row_to_user(row)
+            activation_code = ActivationCode(
+                user_id=row["id"],
+                code=row["code"],
+                created_at=row["code_created_at"],
+                expires_at=row["expires_at"],
             )
+            return created_user, activation_code
+
+        raise ValueError("Could not generate unique activation code")
 
     def get_by_email(self, email: str) -> User | None:
         """Get user by email."""
-        query = "SELECT * FROM users WHERE email = %s"
-
         with get_db_cursor() as cursor:
-            cursor.execute(query, (email,))
-            row = cursor.fetchone()
-
-            if row:
-                return User(
-                    id=row["id"],
-                    email=row["email"],
-                    password_hash=row["password_hash"],
-                    is_active=row["is_active"],
-                    created_at=row["created_at"],
-                )
-            return None
+            execute_prepared(cursor, "user_by_email", self._GET_BY_EMAIL_SQL, (email,))
+            return _row_to_user(cursor.fetchone())
 
     def get_by_id(self, user_id: str) -> User | None:
         """Get user by ID."""
-        query = "SELECT * FROM users WHERE id = %s"
-
         with get_db_cursor() as cursor:
-            cursor.execute(query, (user_id,))
-            row = cursor.fetchone()
-
-            if row:
-                return User(
-                    id=row["id"],
-                    email=row["email"],
-                    password_hash=row["password_hash"],
-                    is_active=row["is_active"],
-                    created_at=row["created_at"],
-                )
-            return None
+            execute_prepared(cursor, "user_by_id", self._GET_BY_ID_SQL, (user_id,))
+            return _row_to_user(cursor.fetchone())
 
     def update(self, user: User) -> User:
         """Update user."""
-        query = """
+        query = f"""
             UPDATE users
             SET email = %s, password_hash = %s, is_active = %s
             WHERE id = %s
-            RETURNING *
+            RETURNING {_USER_COLUMNS}
         """
 
         with get_db_cursor() as cursor:
             cursor.execute(query, (user.email, user.password_hash, user.is_active, user.id))
-            row = cursor.fetchone()
+            updated_user: User | None = _row_to_user(cursor.fetchone())
 
-            if not row:
+            if updated_user is None:
                 raise ValueError(f"User {user.id} not found")
 
-            return User(
-                id=row["id"],
-                email=row["email"],
-                password_hash=row["password_hash"],
-                is_active=row["is_active"],
-                created_at=row["created_at"],
-            )
+            return updated_user
 
     def delete(self, user_id: str) -> bool:
         """Delete user."""
@@ -104,35 +192,42 @@ class PostgreSQLUserRepository(UserRepositoryInterface):
 
     def list_all(self, limit: int = 100, offset: int = 0) -> list[User]:
         """List users."""
-        query = "SELECT * FROM users LIMIT %s OFFSET %s"
+        from psycopg2.extensions import cursor as tuple_cursor
+
+        # Columns in User field order, so each tuple row maps straight onto User(*row)
+        query = f"SELECT {_USER_COLUMNS} FROM users LIMIT %s OFFSET %s"
 
         with get_db_cursor() as cursor:
-            cursor.execute(query, (limit, offset))
-            rows = cursor.fetchall()
-
-            return [
-                User(
-                    id=row["id"],
-                    email=row["email"],
-                    password_hash=row["password_hash"],
-                    is_active=row["is_active"],
-                    created_at=row["created_at"],
-                )
-                for row in rows
-            ]
+            if limit <= self.list_page_size:
+                # Small page: a plain tuple cursor is one round-trip
+                with cursor.connection.cursor(cursor_factory=tuple_cursor) as rows:
+                    rows.execute(query, (limit, offset))
+                    return [User(*row) for row in rows]
+
+            # Large page: stream from a server-side cursor, list_page_size rows per fetch
+            with cursor.connection.cursor(name="users_stream", cursor_factory=tuple_cursor) as rows:
+                rows.itersize = self.list_page_size
+                rows.execute(query, (limit, offset))
+                return [User(*row) for row in rows]
 
     def exists_by_email(self, email: str) -> bool:
         """Check if user exists."""
-        query = "SELECT 1 FROM users WHERE email = %s"
-
         with get_db_cursor() as cursor:
-            cursor.execute(query, (email,))
-            return cursor.fetchone() is not None
+            execute_prepared(cursor, "user_exists_by_email", self._EXISTS_BY_EMAIL_SQL, (email,))
+            return cursor.fetchone()["user_exists"]
 
     def activate_user(self, user_id: str) -> bool:
         """Activate user."""
-        query = "UPDATE users SET is_active = true WHERE id = %s"
-
         with get_db_cursor() as cursor:
-            cursor.execute(query, (user_id,))
+            execute_prepared(cursor, "user_activate", self._ACTIVATE_SQL, (user_id,))
             return cursor.rowcount > 0
+
+    def activate_with_code(
+        self, code: str, activation_repo: ActivationCodeRepositoryInterface
+    ) -> User | None:
+        """Activate the owner of a live code and delete the code in a single round-trip."""
+        with get_db_cursor() as cursor:
+            execute_prepared(
+                cursor, "user_activate_with_code", self._ACTIVATE_WITH_CODE_SQL, (code,)
+            )
+            return _row_to_user(cursor.fetchone())
@@ -12,6 +12,10 @@ class UserRepositoryInterface(ABC):
     def create(self, user: User) -> User:
         """Create a new user."""
 
+    @abstractmethod
+    def create_if_absent(self, user: User) -> User | None:
+        """Create a new user unless the email is taken. Returns None if it already existed."""
+
     @abstractmethod
     def get_by_id(self, user_id: str) -> User | None:
         """Get user by ID."""
@@ -40,6 +44,40 @@ class UserRepositoryInterface(ABC):
     def activate_user(self, user_id: str) -> bool:
         """Activate a user account."""
 
+    def create_with_activation_code(
+        self, user: User, activation_repo: "ActivationCodeRepositoryInterface"
+    ) -> tuple[User, ActivationCode] | None:
+        """Create a new user and its first activation code.
+
+        Returns None (and creates nothing) when the email is already taken.
+        The default composes the individual repository calls and is not atomic;
+        transactional backends override it with a single statement (PostgreSQL).
+        """
+        created_user: User | None = self.create_if_absent(user=user)
+        if created_user is None:
+            return None
+        activation_code: ActivationCode = activation_repo.create(user_id=created_user.id)
+        return created_user, activation_code
+
+    def activate_with_code(
+        self, code: str, activation_repo: "ActivationCodeRepositoryInterface"
+    ) -> User | None:
+        """Activate the owner of a live activation code and consume the code.
+
+        Returns the activated user, or None when the code is unknown, expired or
+        its user is gone. The default composes the individual repository calls
+        and is not atomic; transactional backends override it with a single
+        statement (PostgreSQL).
+        """
+        activation_code: ActivationCode | None = activation_repo.get_by_code(code)
+        if activation_code is None or activation_code.is_expired:
+            return None
+
+        if not self.activate_user(user_id=activation_code.user_id):
+            return None
+        activation_repo.delete(user_id=activation_code.user_id)
+        return self.get_by_id(user_id=activation_code.user_id)
+
 
 class ActivationCodeRepositoryInterface(ABC):
     """Abstract interface for activation code repository operations."""
@@ -70,3 +70,10 @@ class PasswordTooWeak(AuthenticationError):
 
     def __init__(self, message="Password does not meet security requirements"):
         super().__init__(message)
+
+
+class InvalidEmail(AuthenticationError):
+    """Raised when an email address is not well-formed."""
+
+    def __init__(self, message="Invalid email address"):
+        super().__init__(message)
@@ -1,27 +1,29 @@
 """Data models for the authentication service."""
 
 import datetime
-import uuid
 from dataclasses import dataclass, field
 
+# Bound once: utc_now() runs in every model constructor and expiry check
+_UTC = datetime.timezone.utc
+
 
 def utc_now() -> datetime.datetime:
     """Get current UTC datetime with timezone info."""
-    return datetime.datetime.now(datetime.timezone.utc)
+    return datetime.datetime.now(_UTC)
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Represents a user in the authentication system."""
 
     email: str
     password_hash: str
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str | None = None  # Assigned by the repository on create
     is_active: bool = False
     created_at: datetime.datetime = field(default_factory=utc_now)
 
 
-@dataclass
+@dataclass(slots=True)
 class ActivationCode:
     """Represents an activation code for user account activation."""
 
@@ -31,21 +33,17 @@ class ActivationCode:
     expires_at: datetime.datetime | None = field(default=None)
 
     def __post_init__(self) -> None:
+        # Timestamps are made timezone-aware (naive ones are taken as UTC) once, here,
+        # so is_expired is a plain comparison
+        if self.created_at.tzinfo is None:
+            self.created_at = self.created_at.replace(tzinfo=_UTC)
         if self.expires_at is None:
             # Code expires after 1 minute (client specification)
             self.expires_at = self.created_at + datetime.timedelta(minutes=1)
+        elif self.expires_at.tzinfo is None:
+            self.expires_at = self.expires_at.replace(tzinfo=_UTC)
 
     @property
     def is_expired(self) -> bool:
         """Check if the activation code has expired."""
-        if self.expires_at is None:
-            return False
-
-        now = utc_now()
-        expires_at = self.expires_at
-
-        # Handle timezone-naive expires_at by assuming UTC
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
-
-        return now > expires_at
+        return utc_now() > self.expires_at
@@ -0,0 +1,45 @@
+"""Stateless access tokens for the authentication service."""
+
+import datetime
+
+import jwt
+
+from src.services.exceptions import InvalidCredentials
+from src.services.models import User, utc_now
+
+
+class TokenService:
+    """Issue and verify short-lived HS256 access tokens.
+
+    A token is checked with a single HMAC-SHA256, so authenticated requests
+    carrying one skip the bcrypt verification required by Basic Auth.
+    """
+
+    algorithm = "HS256"
+
+    def __init__(self, secret: str, expiry_minutes: int = 15) -> None:
+        self._secret: str = secret
+        self.expiry_minutes: int = expiry_minutes
+
+    def issue(self, user: User) -> str:
+        """Create a signed access token for the given user."""
+        now: datetime.datetime = utc_now()
+        payload: dict[str, object] = {
+            "sub": user.id,
+            "iat": now,
+            "exp": now + datetime.timedelta(minutes=self.expiry_minutes),
+        }
+        return jwt.encode(payload, self._secret, algorithm=self.algorithm)
+
+    def verify(self, token: str) -> str:
+        """Validate a token and return the user id it was issued for."""
+        try:
+            payload: dict[str, object] = jwt.decode(
+                token,
+                self._secret,
+                algorithms=[self.algorithm],
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as exc:
+            raise InvalidCredentials(message="Invalid or expired token") from exc
+        return str(payload["sub"])
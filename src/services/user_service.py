@@ -1,8 +1,17 @@
 """User service for authentication and account management."""
 
-import base64
+import re
+import threading
+from functools import cached_property
 
-import bcrypt
+try:
+    # SIMD-accelerated decoder, drop-in replacement for the stdlib module
+    import pybase64 as base64
+except ImportError:
+    # pybase64 not installed, fall back to the stdlib implementation
+    import base64
+
+from cachetools import TTLCache
 
 from src.persistances.repositories.interfaces import (
     ActivationCodeRepositoryInterface,
@@ -12,9 +21,19 @@ from src.services.exceptions import (
     ActivationCodeExpired,
     InvalidActivationCode,
     InvalidCredentials,
+    InvalidEmail,
     UserNotFound,
 )
 from src.services.models import ActivationCode, User
+from src.services.password_hasher import BcryptPasswordHasher
+
+# Structural check only (local@domain.tld); no deliverability lookup
+_EMAIL_RE: re.Pattern[str] = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form stored and looked up: surrounding whitespace removed, lowercased."""
+    return email.strip().lower()
 
 
 class UserService:
@@ -25,56 +44,98 @@ class UserService:
         user_repo: UserRepositoryInterface,
         activation_repo: ActivationCodeRepositoryInterface,
         mailer,
+        password_hasher: BcryptPasswordHasher | None = None,
     ) -> None:
         self.user_repo = user_repo
         self.activation_repo = activation_repo
         self.mailer = mailer
+        self.password_hasher = password_hasher or BcryptPasswordHasher()
+        # Recently loaded *active* users by email. Unknown emails always reach the repository
+        # (registration/enumeration behaviour is unchanged), and so do inactive accounts:
+        # the cache is per process, so another worker's activation must be seen at once
+        self._user_cache: TTLCache[str, User] = TTLCache(maxsize=10_000, ttl=30)
+        self._user_cache_lock = threading.Lock()
+
+    @cached_property
+    def _dummy_hash(self) -> str:
+        """Throwaway bcrypt hash verified for unknown emails, computed on first use."""
+        return self.password_hasher.hash(password="dummy-password")
+
+    def clear_user_cache(self) -> None:
+        """Drop every cached user (e.g. after the repository was reset outside the service)."""
+        with self._user_cache_lock:
+            self._user_cache.clear()
+
+    def _invalidate_user(self, email: str) -> None:
+        """Drop a cached user after a write so the next lookup reloads it."""
+        with self._user_cache_lock:
+            self._user_cache.pop(email, None)
 
     def register(self, email: str, password: str) -> User | None:
         """Register a new user and send activation email."""
-        # Vérifier si l'utilisateur existe déjà (retourner None pour éviter l'énumération d'emails)
-        if self.user_repo.exists_by_email(email=email):
+        account: tuple[User, ActivationCode] | None = self.create_account(
+            email=email, password=password
+        )
+        if account is None:
             return None
 
+        created_user, activation_code = account
+        self.send_activation_email(email=created_user.email, code=activation_code.code)
+        return created_user
+
+    def create_account(self, email: str, password: str) -> tuple[User, ActivationCode] | None:
+        """Create an inactive user and its activation code, without sending the email.
+
+        Returns None when the email is already registered. Callers deliver the code
+        with send_activation_email, e.g. once the HTTP response has been sent.
+        """
+        email = normalize_email(email)
+        if not _EMAIL_RE.match(email):
+            raise InvalidEmail(message=f"Invalid email address: {email}")
+
         # Hasher le mot de passe
-        password_hash: str = bcrypt.hashpw(
-            password=password.encode(), salt=bcrypt.gensalt()
-        ).decode()
+        password_hash: str = self.password_hasher.hash(password=password)
 
-        # Créer l'utilisateur (inactif par défaut)
+        # Créer l'utilisateur (inactif par défaut) et son code (une seule requête en PostgreSQL)
         user = User(email=email, password_hash=password_hash, is_active=False)
-        created_user: User = self.user_repo.create(user=user)
+        # Insertion conditionnelle : None si l'email existe déjà (évite l'énumération d'emails)
+        account: tuple[User, ActivationCode] | None = self.user_repo.create_with_activation_code(
+            user=user, activation_repo=self.activation_repo
+        )
+        if account is None:
+            return None
+        self._invalidate_user(email=email)
 
-        # Générer et envoyer le code d'activation
-        activation_code: ActivationCode = self.activation_repo.create(user_id=created_user.id)
-        self.mailer.send_activation_email(email, activation_code.code)
+        return account
 
-        return created_user
+    def send_activation_email(self, email: str, code: str) -> None:
+        """Send an activation code to the user (only ever called after the commit)."""
+        self.mailer.send_activation_email(email, code)
 
     def activate_account(self, activation_code: str) -> bool:
         """Activate user account with activation code."""
-        # Trouver le code d'activation
+        # Vérifier le code, activer l'utilisateur et consommer le code en un seul appel
+        activated_user: User | None = self.user_repo.activate_with_code(
+            code=activation_code, activation_repo=self.activation_repo
+        )
+        if activated_user is not None:
+            self._invalidate_user(email=activated_user.email)
+            return True
+
+        # Chemin d'erreur uniquement : déterminer pourquoi l'activation a échoué
         code_obj: ActivationCode | None = self.activation_repo.get_by_code(activation_code)
         if not code_obj:
             raise InvalidActivationCode(message="Invalid activation code")
 
-        # Vérifier si le code a expiré
         if code_obj.is_expired:
             self.activation_repo.delete(user_id=code_obj.user_id)
             raise ActivationCodeExpired(message="Activation code has expired")
 
-        # Activer l'utilisateur
-        success: bool = self.user_repo.activate_user(user_id=code_obj.user_id)
-        if success:
-            # Supprimer le code d'activation utilisé
-            self.activation_repo.delete(user_id=code_obj.user_id)
-            return True
-
         raise UserNotFound(username="User not found")
 
     def resend_activation_code(self, email: str) -> bool:
         """Resend activation code to user email."""
-        user: User | None = self.user_repo.get_by_email(email=email)
+        user: User | None = self.get_user_by_email(email=email)
         if not user:
             raise UserNotFound(username=f"User with email {email} not found")
 
@@ -83,44 +144,61 @@ class UserService:
 
         # Générer un nouveau code
         activation_code: ActivationCode = self.activation_repo.create(user_id=user.id)
-        self.mailer.send_activation_email(email, activation_code.code)
+        self.mailer.send_activation_email(user.email, activation_code.code)
         return True
 
     def authenticate(self, email: str, password: str) -> User:
         """Authenticate user with email and password (Basic Auth)."""
-        user: User | None = self.user_repo.get_by_email(email=email)
+        user: User | None = self.get_user_by_email(email=email)
         if not user:
-            raise UserNotFound(username=f"User with email {email} not found")
+            # Payer le même coût bcrypt qu'un vrai utilisateur : ni oracle temporel ni énumération
+            self.password_hasher.verify(password=password, password_hash=self._dummy_hash)
+            raise InvalidCredentials(message="Invalid credentials")
 
         if not user.is_active:
             raise InvalidCredentials(message="Account not activated")
 
         # Vérifier le mot de passe
-        if bcrypt.checkpw(password=password.encode(), hashed_password=user.password_hash.encode()):
+        if self.password_hasher.verify(password=password, password_hash=user.password_hash):
             return user
 
         raise InvalidCredentials(message="Invalid credentials")
 
-    def authenticate_basic(self, authorization_header: str) -> User:
-        """Authenticate user from Basic Auth header."""
-        if not authorization_header.startswith("Basic "):
-            raise InvalidCredentials(message="Invalid authorization header")
+    def authenticate_basic_credentials(self, encoded_credentials: str | bytes) -> User:
+        """Authenticate user from the base64 token of a Basic Auth header.
 
+        The header itself is parsed (strictly) by the API layer, in src.api.deps.get_basic_user.
+        """
         try:
-            # Décoder le header Basic Auth
-            encoded_credentials: str = authorization_header.split(" ")[1]
-            decoded_credentials: str = base64.b64decode(encoded_credentials).decode(
-                encoding="utf-8"
+            # Décoder les identifiants Basic Auth (découpés en bytes, un seul décodage par champ)
+            raw_email, raw_password = base64.b64decode(encoded_credentials, validate=True).split(
+                b":", 1
             )
-            email, password = decoded_credentials.split(":", 1)
-
-            return self.authenticate(email=email, password=password)
-        except (ValueError, IndexError) as exc:
+            email: str = raw_email.decode("utf-8")
+            password: str = raw_password.decode("utf-8")
+        except ValueError as exc:
+            # binascii.Error et UnicodeDecodeError héritent de ValueError
             raise InvalidCredentials(message="Invalid authorization header format") from exc
 
+        return self.authenticate(email=email, password=password)
+
+    def get_user_by_id(self, user_id: str) -> User | None:
+        """Get user by id."""
+        return self.user_repo.get_by_id(user_id=user_id)
+
     def get_user_by_email(self, email: str) -> User | None:
-        """Get user by email."""
-        return self.user_repo.get_by_email(email=email)
+        """Get user by email (active users are served from a short-lived cache)."""
+        email = normalize_email(email)
+        with self._user_cache_lock:
+            user: User | None = self._user_cache.get(email)
+        if user is not None:
+            return user
+
+        user = self.user_repo.get_by_email(email=email)
+        if user is not None and user.is_active:
+            with self._user_cache_lock:
+                self._user_cache[email] = user
+        return user
 
     def cleanup_expired_codes(self) -> int:
         """Clean up expired activation codes."""
@@ -0,0 +1 @@
+"""Background tasks for Simple Auth (Celery worker side and scheduled jobs)."""
@@ -0,0 +1,23 @@
+"""Celery application used to run background tasks out of the request path.
+
+Start a worker with:
+    celery -A src.tasks.celery_app worker -Q email_queue --loglevel=info
+"""
+
+from celery import Celery
+
+from src.config.settings import get_settings
+
+# Dedicated queue so email delivery is never starved by other task types
+EMAIL_QUEUE = "email_queue"
+
+celery_app = Celery(
+    main="simple_auth",
+    broker=get_settings().broker_url or None,
+    include=["src.tasks.email_tasks"],
+)
+celery_app.conf.update(
+    task_routes={"src.tasks.email_tasks.*": {"queue": EMAIL_QUEUE}},
+    task_acks_late=True,  # Redeliver the email if the worker dies mid-send
+    worker_prefetch_multiplier=1,
+)
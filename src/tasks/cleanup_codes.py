@@ -0,0 +1,30 @@
+"""One-shot removal of expired activation codes, for cron or an external scheduler.
+
+Run with:
+    python -m src.tasks.cleanup_codes
+"""
+
+import logging
+
+from src.config.logging import configure_logging
+from src.di import get_container
+from src.persistances.db import close_pool
+from src.persistances.repositories.interfaces import ActivationCodeRepositoryInterface
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Delete expired activation codes once, then close the database pool."""
+    configure_logging()
+    container = get_container()
+    activation_repo: ActivationCodeRepositoryInterface = container.activation_code_repository()
+    try:
+        removed: int = activation_repo.cleanup_expired()
+        logger.info("Cleaned up %d expired activation codes", removed)
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
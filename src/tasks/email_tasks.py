@@ -0,0 +1,30 @@
+"""Email delivery tasks executed by the Celery worker."""
+
+import smtplib
+from functools import lru_cache
+
+from src.config.settings import get_settings
+from src.di.providers import InfrastructureProvider
+from src.persistances.email_client import EmailClientInterface
+from src.tasks.celery_app import celery_app
+
+
+@lru_cache(maxsize=1)
+def _get_delivery_client() -> EmailClientInterface:
+    """Email client doing the real delivery (mock or SMTP, never the queue itself)."""
+    provider = InfrastructureProvider(use_mock_email=get_settings().use_mock_email)
+    return provider.get_email_client()
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(smtplib.SMTPException, ConnectionError, OSError),
+    retry_backoff=True,
+    max_retries=5,
+)
+def send_activation_email(self, to_email: str, activation_code: str) -> None:
+    """Deliver an activation email, retrying with exponential backoff on SMTP failures."""
+    if not _get_delivery_client().send_activation_email(to_email, activation_code):
+        raise smtplib.SMTPException(
+            f"Activation email to {to_email} could not be sent (attempt {self.request.retries + 1})"
+        )
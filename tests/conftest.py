@@ -0,0 +1,41 @@
+"""Shared pytest configuration for the unit and integration suites."""
+
+import time
+
+import pytest
+
+from src.config.settings import reset_settings
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_settings_env():
+    """Hash test passwords at the minimum bcrypt cost (4 rounds instead of the production 12)
+    and provide the JWT signing key the token service requires.
+
+    Applied before any container is built: providers read both from the settings.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("BCRYPT_ROUNDS", "4")
+        monkeypatch.setenv("JWT_SECRET", "test-jwt-secret")
+        reset_settings()
+        yield
+    reset_settings()
+
+
+# Longest real wait a test may take; expiry is tested by moving expires_at, not by waiting
+_MAX_TEST_SLEEP_SECONDS = 0.1
+
+
+@pytest.fixture(autouse=True)
+def no_long_sleep(monkeypatch):
+    """Fail fast on any time.sleep longer than _MAX_TEST_SLEEP_SECONDS (no minute waits)."""
+    real_sleep = time.sleep
+
+    def guarded_sleep(seconds: float) -> None:
+        if seconds > _MAX_TEST_SLEEP_SECONDS:
+            raise AssertionError(
+                f"time.sleep({seconds}) in a test: mutate expires_at instead of waiting"
+            )
+        real_sleep(seconds)
+
+    monkeypatch.setattr(time, "sleep", guarded_sleep)
@@ -9,31 +9,45 @@ Requirements:
 """
 
 import base64
+import datetime
 import time
 import uuid
 
 import pytest
 from fastapi.testclient import TestClient
 
+from src.di.container import AppContainer
 from src.main import app
 
+_UTC = datetime.timezone.utc
+
+
+@pytest.fixture(scope="module")
+def client():
+    """One client per module: FastAPI startup (container warm-up, pool) runs once."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def activation_repo():
+    """PostgreSQL activation code repository shared by the module's tests."""
+    container = AppContainer(use_postgresql=True, use_mock_email=True)
+    return container.activation_code_repository()
+
 
 @pytest.mark.integration
 class TestAPIIntegration:
     """Integration tests for the complete API workflow."""
 
-    def setup_method(self):
-        """Setup fresh client for each test."""
-        self.client = TestClient(app)
-
-    def test_complete_user_registration_flow(self):
+    def test_complete_user_registration_flow(self, client, activation_repo):
         """Test the complete user registration and activation flow."""
         # Given
         unique_email = f"integration-{uuid.uuid4().hex[:8]}@example.com"
         user_data = {"email": unique_email, "password": "password123"}
 
         # Step 1: Register user
-        response = self.client.post("/api/v1/users", json=user_data)
+        response = client.post("/api/v1/users", json=user_data)
 
         # Then
         assert response.status_code == 201
@@ -46,17 +60,11 @@ class TestAPIIntegration:
 
         # Step 2: Try to access protected endpoint before activation (should fail)
         auth_header = self._create_basic_auth_header(user_data["email"], user_data["password"])
-        response = self.client.get("/api/v1/users/me", headers={"Authorization": auth_header})
+        response = client.get("/api/v1/users/me", headers={"Authorization": auth_header})
 
         assert response.status_code == 401
 
         # Step 3: Get activation code (in real app, this would be from email)
-        # For integration tests, we use PostgreSQL explicitly
-        from src.di.container import AppContainer
-
-        container = AppContainer(use_postgresql=True, use_mock_email=True)
-        activation_repo = container.activation_code_repository()
-
         # Get user ID from registration response
         user_id = result["user_id"]
         activation_code = activation_repo.get_by_user_id(user_id)
@@ -64,31 +72,31 @@ class TestAPIIntegration:
 
         # Step 4: Activate account with new RESTful endpoint (using dummy user_id)
         activation_data = {"activation_code": activation_code.code}
-        response = self.client.patch(f"/api/v1/users/{user_id}", json=activation_data)
+        response = client.patch(f"/api/v1/users/{user_id}", json=activation_data)
 
         assert response.status_code == 200
         assert response.json()["message"] == "Account activated successfully."
 
         # Step 5: Now access protected endpoint (should succeed)
-        response = self.client.get("/api/v1/users/me", headers={"Authorization": auth_header})
+        response = client.get("/api/v1/users/me", headers={"Authorization": auth_header})
 
         assert response.status_code == 200
         user_info = response.json()
         assert user_info["email"] == user_data["email"]
         assert user_info["is_active"] is True
 
-    def test_duplicate_registration_security(self):
+    def test_duplicate_registration_security(self, client):
         """Test that duplicate registrations don't reveal user existence."""
         # Given
         unique_email = f"duplicate-{uuid.uuid4().hex[:8]}@example.com"
         user_data = {"email": unique_email, "password": "password123"}
 
         # First registration
-        response1 = self.client.post("/api/v1/users", json=user_data)
+        response1 = client.post("/api/v1/users", json=user_data)
         assert response1.status_code == 201
 
         # Second registration with same email
-        response2 = self.client.post("/api/v1/users", json=user_data)
+        response2 = client.post("/api/v1/users", json=user_data)
 
         # Should return same response (security measure)
         assert response2.status_code == 201
@@ -97,41 +105,34 @@ class TestAPIIntegration:
             == "User registered successfully. Check your email for activation code."
         )
 
-    def test_invalid_activation_code(self):
+    def test_invalid_activation_code(self, client):
         """Test activation with invalid code."""
         # Given
         invalid_data = {"activation_code": "9999"}
 
         # When - using dummy user ID since we don't have a real one
-        response = self.client.patch("/api/v1/users/dummy-id", json=invalid_data)
+        response = client.patch("/api/v1/users/dummy-id", json=invalid_data)
 
         # Then
         assert response.status_code == 400
         assert "Invalid activation code" in response.json()["detail"]
 
-    def test_expired_activation_code(self):
+    def test_expired_activation_code(self, client, activation_repo):
         """Test that expired activation codes are rejected."""
         # Given
         unique_email = f"expired-{uuid.uuid4().hex[:8]}@example.com"
         user_data = {"email": unique_email, "password": "password123"}
-        response = self.client.post("/api/v1/users", json=user_data)
+        response = client.post("/api/v1/users", json=user_data)
         user_id = response.json()["user_id"]
 
         # Get and manually expire the activation code
-        from src.di.container import AppContainer
-
-        container = AppContainer(use_postgresql=True, use_mock_email=True)
-        activation_repo = container.activation_code_repository()
-
         activation_code = activation_repo.get_by_user_id(user_id)
         assert activation_code is not None
 
         # Expire the code in database
-        import datetime
-
         from src.persistances.db import get_db_cursor
 
-        expired_time = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+        expired_time = datetime.datetime.now(_UTC) - datetime.timedelta(seconds=1)
         with get_db_cursor() as cursor:
             cursor.execute(
                 "UPDATE activation_codes SET expires_at = %s WHERE user_id = %s",
@@ -140,56 +141,78 @@ class TestAPIIntegration:
 
         # When - try to activate with expired code
         activation_data = {"activation_code": activation_code.code}
-        response = self.client.patch(f"/api/v1/users/{user_id}", json=activation_data)
+        response = client.patch(f"/api/v1/users/{user_id}", json=activation_data)
 
         # Then
         assert response.status_code == 400
         assert "expired" in response.json()["detail"].lower()
 
-    def test_authentication_endpoints(self):
+    def test_authentication_endpoints(self, client, activation_repo):
         """Test authentication with various scenarios."""
         # Setup: Create and activate user
         unique_email = f"auth-{uuid.uuid4().hex[:8]}@example.com"
         user_data = {"email": unique_email, "password": "password123"}
-        response = self.client.post("/api/v1/users", json=user_data)
+        response = client.post("/api/v1/users", json=user_data)
         user_id = response.json()["user_id"]
 
         # Activate user
-        from src.di.container import AppContainer
-
-        container = AppContainer(use_postgresql=True, use_mock_email=True)
-        activation_repo = container.activation_code_repository()
         activation_code = activation_repo.get_by_user_id(user_id)
         assert activation_code is not None
 
         activation_data = {"activation_code": activation_code.code}
-        self.client.patch(f"/api/v1/users/{user_id}", json=activation_data)
+        client.patch(f"/api/v1/users/{user_id}", json=activation_data)
 
         # Test 1: Valid authentication
         auth_header = self._create_basic_auth_header(user_data["email"], user_data["password"])
-        response = self.client.get("/api/v1/users/me", headers={"Authorization": auth_header})
+        response = client.get("/api/v1/users/me", headers={"Authorization": auth_header})
         assert response.status_code == 200
 
         # Test 2: Invalid password
         wrong_auth = self._create_basic_auth_header(user_data["email"], "wrong_password")
-        response = self.client.get("/api/v1/users/me", headers={"Authorization": wrong_auth})
+        response = client.get("/api/v1/users/me", headers={"Authorization": wrong_auth})
         assert response.status_code == 401
 
         # Test 3: Non-existent user
         # Test with fake credentials - should return 401 (not 404) for Basic Auth security
         fake_email = f"fake-{uuid.uuid4().hex[:8]}@example.com"
         fake_auth = self._create_basic_auth_header(fake_email, "password")
-        response = self.client.get("/api/v1/users/me", headers={"Authorization": fake_auth})
+        response = client.get("/api/v1/users/me", headers={"Authorization": fake_auth})
         assert response.status_code == 401  # All auth failures return 401 for Basic Auth
 
         # Test 4: Malformed auth header
-        response = self.client.get("/api/v1/users/me", headers={"Authorization": "Invalid Header"})
+        response = client.get("/api/v1/users/me", headers={"Authorization": "Invalid Header"})
         assert response.status_code == 401
 
-    def test_api_error_responses(self):
+    def test_mixed_case_stored_email_still_authenticates(self, client, activation_repo):
+        """Test that a row stored with mixed case (before normalization) is still found."""
+        # Given - an activated user whose stored email predates lowercasing
+        unique_email = f"legacy-{uuid.uuid4().hex[:8]}@example.com"
+        response = client.post("/api/v1/users", json={"email": unique_email, "password": "pw123"})
+        user_id = response.json()["user_id"]
+        activation_code = activation_repo.get_by_user_id(user_id)
+        client.patch(f"/api/v1/users/{user_id}", json={"activation_code": activation_code.code})
+
+        from src.persistances.db import get_db_cursor
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE users SET email = %s WHERE id = %s", (unique_email.capitalize(), user_id)
+            )
+
+        # When / Then - lookups compare lower(email)
+        auth_header = self._create_basic_auth_header(unique_email, "pw123")
+        response = client.get("/api/v1/users/me", headers={"Authorization": auth_header})
+        assert response.status_code == 200
+
+        # Re-registering takes the silent "already exists" path, not a 500
+        response = client.post("/api/v1/users", json={"email": unique_email, "password": "pw123"})
+        assert response.status_code == 201
+        assert response.json()["user_id"] is None
+
+    def test_api_error_responses(self, client):
         """Test API error handling and response formats."""
         # Test 1: Invalid JSON
-        response = self.client.post(
+        response = client.post(
             "/api/v1/users", content="invalid json", headers={"content-type": "application/json"}
         )
         assert response.status_code == 422
@@ -197,35 +220,28 @@ class TestAPIIntegration:
         # Test 2: Missing fields
         # Test missing password
         test_email = f"test-{uuid.uuid4().hex[:8]}@example.com"
-        response = self.client.post("/api/v1/users", json={"email": test_email})
+        response = client.post("/api/v1/users", json={"email": test_email})
         assert response.status_code == 422
 
         # Test 3: Invalid email format
-        response = self.client.post(
-            "/api/v1/users", json={"email": "invalid-email", "password": "pass"}
-        )
+        response = client.post("/api/v1/users", json={"email": "invalid-email", "password": "pass"})
         assert response.status_code == 422
 
         # Test 4: Missing activation code
-        response = self.client.patch("/api/v1/users/dummy-id", json={})
+        response = client.patch("/api/v1/users/dummy-id", json={})
         assert response.status_code == 422
 
-    def test_one_minute_expiration_requirement(self):
+    def test_one_minute_expiration_requirement(self, client, activation_repo):
         """Test the specific 1-minute expiration requirement from client specs."""
         # Given - register user
         unique_email = f"timing-{uuid.uuid4().hex[:8]}@example.com"
         user_data = {"email": unique_email, "password": "password123"}
         start_time = time.time()
 
-        response = self.client.post("/api/v1/users", json=user_data)
+        response = client.post("/api/v1/users", json=user_data)
         user_id = response.json()["user_id"]
 
         # Get activation code timing
-        from src.di.container import AppContainer
-
-        container = AppContainer(use_postgresql=True, use_mock_email=True)
-        activation_repo = container.activation_code_repository()
-
         activation_code = activation_repo.get_by_user_id(user_id)
         assert activation_code is not None
         assert activation_code.expires_at is not None
@@ -253,9 +269,10 @@ class TestAPIIntegration:
 class TestAPIDocumentation:
     """Tests for API documentation and OpenAPI spec."""
 
-    def setup_method(self):
-        """Setup client."""
-        self.client = TestClient(app)
+    @classmethod
+    def setup_class(cls):
+        """Setup one client for the class (docs need no startup, so no lifespan)."""
+        cls.client = TestClient(app)
 
     def test_openapi_documentation_available(self):
         """Test that OpenAPI documentation is available."""
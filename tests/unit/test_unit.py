@@ -1,6 +1,8 @@
 """Unit tests for Simple Auth - Fast tests using in-memory implementations."""
 
-import uuid
+import base64
+import datetime
+import itertools
 
 import pytest
 
@@ -9,26 +11,99 @@ from src.services.exceptions import (
     ActivationCodeExpired,
     InvalidActivationCode,
     InvalidCredentials,
-    UserNotFound,
+    InvalidEmail,
 )
 
+_UTC = datetime.timezone.utc
+
+
+class FakeHasher:
+    """Instant stand-in for BcryptPasswordHasher: unit tests exercise flows, not the KDF."""
+
+    def hash(self, password: str) -> str:
+        return "fake$" + password
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return password_hash == "fake$" + password
+
+
+class RecordingMailer:
+    """Email client stub that records (email, code) pairs instead of logging them."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str]] = []
+
+    def send_activation_email(self, to_email: str, activation_code: str) -> bool:
+        self.calls.append((to_email, activation_code))
+        return True
+
+
+# Unique suffix for test emails (each process has its own in-memory repositories)
+_COUNTER = itertools.count()
+
+CANONICAL_EMAIL = "canonical@example.com"
+CANONICAL_PASSWORD = "password123"
+
+
+@pytest.fixture(scope="module")
+def activated_user_ctx():
+    """Register and activate one canonical user for the read-only tests (a single bcrypt hash).
+
+    Returns (user_service, user, activation_repo, user_repo, mailer); tests using it must not
+    mutate that user or the repositories.
+    """
+    container = AppContainer(
+        use_postgresql=False,
+        use_mock_email=True,
+        password_hasher=FakeHasher(),
+        email_client=RecordingMailer(),
+    )
+    user_service = container.user_service()
+    activation_repo = container.activation_code_repository()
+    user = user_service.register(CANONICAL_EMAIL, CANONICAL_PASSWORD)
+    assert user is not None
+    user_service.activate_account(activation_repo.get_by_user_id(user.id).code)
+
+    yield (
+        user_service,
+        user_service.get_user_by_id(user.id),
+        activation_repo,
+        container.user_repository(),
+        container.email_client(),
+    )
+    container.cleanup_resources()
+
 
 @pytest.mark.unit
 class TestUserServiceUnit:
     """Unit tests for UserService using in-memory repositories."""
 
+    @classmethod
+    def setup_class(cls):
+        """Wire one in-memory container for the whole class."""
+        # Use in-memory implementations, a fake hasher and a recording mailer for fast tests
+        cls.mailer = RecordingMailer()
+        cls.container = AppContainer(
+            use_postgresql=False,
+            use_mock_email=True,
+            password_hasher=FakeHasher(),
+            email_client=cls.mailer,
+        )
+
     def setup_method(self):
-        """Setup fresh in-memory container for each test."""
-        # Use in-memory implementations for fast tests
-        self.container = AppContainer(use_postgresql=False, use_mock_email=True)
+        """Reset the shared repositories, user cache and mailer before each test."""
         self.user_service = self.container.user_service()
+        self.user_service.clear_user_cache()
         self.user_repo = self.container.user_repository()
+        self.user_repo.clear()
         self.activation_repo = self.container.activation_code_repository()
+        self.activation_repo.clear()
+        self.mailer.calls.clear()
 
     def test_user_registration_success(self):
         """Test successful user registration creates user and activation code."""
         # Given
-        email = f"test-{uuid.uuid4().hex[:8]}@example.com"
+        email = f"test-{next(_COUNTER)}@example.com"
         password = "password123"
 
         # When
@@ -46,10 +121,13 @@ class TestUserServiceUnit:
         assert len(activation_code.code) == 4
         assert activation_code.code.isdigit()
 
+        # And sent once to the new user
+        assert self.mailer.calls == [(email, activation_code.code)]
+
     def test_user_registration_duplicate_email(self):
         """Test that duplicate email registration returns None (security)."""
         # Given
-        email = f"duplicate-{uuid.uuid4().hex[:8]}@example.com"
+        email = f"duplicate-{next(_COUNTER)}@example.com"
         password = "password123"
 
         # First registration
@@ -59,18 +137,47 @@ class TestUserServiceUnit:
         # Second registration with same email
         user2 = self.user_service.register(email, password)
         assert user2 is None  # Should return None for security
-
-    def test_activation_code_success(self):
-        """Test successful account activation."""
+        assert len(self.mailer.calls) == 1  # No second email either
+
+    @pytest.mark.parametrize("email", ["invalid-email", "no-tld@example", "with space@example.com"])
+    def test_user_registration_invalid_email(self, email):
+        """Test that malformed emails are rejected before any user is created."""
+        # When / Then
+        with pytest.raises(InvalidEmail):
+            self.user_service.register(email, "password123")
+
+        assert self.user_repo.get_by_email(email) is None
+
+    @pytest.mark.parametrize(
+        "scenario, expected",
+        [("valid", None), ("invalid", InvalidActivationCode), ("expired", ActivationCodeExpired)],
+    )
+    def test_activate_account(self, scenario, expected):
+        """Test activation with a valid, an unknown and an expired code."""
         # Given - Register user
-        email = f"activate-{uuid.uuid4().hex[:8]}@example.com"
+        email = f"activate-{next(_COUNTER)}@example.com"
         user = self.user_service.register(email, "password123")
         assert user is not None
         activation_code = self.activation_repo.get_by_user_id(user.id)
         assert activation_code is not None
 
+        code = activation_code.code
+        if scenario == "invalid":
+            # Any code other than the one just issued
+            code = f"{(int(code) + 1) % 10000:04d}"
+        elif scenario == "expired":
+            # Manually expire the code (in-memory, we can modify directly)
+            activation_code.expires_at = datetime.datetime.now(_UTC) - datetime.timedelta(seconds=1)
+
+        if expected is not None:
+            # When/Then
+            with pytest.raises(expected):
+                self.user_service.activate_account(code)
+            assert self.user_repo.get_by_id(user.id).is_active is False
+            return
+
         # When - Activate account
-        self.user_service.activate_account(activation_code.code)
+        self.user_service.activate_account(code)
 
         # Then - User should be active and code should be deleted
         updated_user = self.user_repo.get_by_id(user.id)
@@ -80,101 +187,102 @@ class TestUserServiceUnit:
         remaining_code = self.activation_repo.get_by_user_id(user.id)
         assert remaining_code is None
 
-    def test_activation_code_invalid(self):
-        """Test activation with invalid code raises error."""
-        # Given
-        invalid_code = "9999"
-
-        # When/Then
-        try:
-            self.user_service.activate_account(invalid_code)
-            assert False, "Should have raised InvalidActivationCode"
-        except InvalidActivationCode:
-            pass
-
-    def test_activation_code_expired(self):
-        """Test activation with expired code raises error."""
-        # Given - Register user and expire the code
-        email = f"expired-{uuid.uuid4().hex[:8]}@example.com"
-        user = self.user_service.register(email, "password123")
-        assert user is not None
-        activation_code = self.activation_repo.get_by_user_id(user.id)
-        assert activation_code is not None
-
-        # Manually expire the code (in-memory, we can modify directly)
-        import datetime
-
-        activation_code.expires_at = datetime.datetime.now(
-            datetime.timezone.utc
-        ) - datetime.timedelta(seconds=1)
-
-        # When/Then
-        try:
-            self.user_service.activate_account(activation_code.code)
-            assert False, "Should have raised ActivationCodeExpired"
-        except ActivationCodeExpired:
-            pass
-
-    def test_authentication_success(self):
+    def test_authentication_success(self, activated_user_ctx):
         """Test successful authentication with activated user."""
-        # Given - Register and activate user
-        email = f"auth-{uuid.uuid4().hex[:8]}@example.com"
-        password = "password123"
-        user = self.user_service.register(email, password)
-        assert user is not None
-        activation_code = self.activation_repo.get_by_user_id(user.id)
-        assert activation_code is not None
-        self.user_service.activate_account(activation_code.code)
+        # Given - the shared activated user
+        user_service, user, *_ = activated_user_ctx
 
         # When
-        authenticated_user = self.user_service.authenticate(email, password)
+        authenticated_user = user_service.authenticate(CANONICAL_EMAIL, CANONICAL_PASSWORD)
 
         # Then
         assert authenticated_user is not None
-        assert authenticated_user.email == email
+        assert authenticated_user.id == user.id
+        assert authenticated_user.email == CANONICAL_EMAIL
         assert authenticated_user.is_active is True
 
-    def test_authentication_invalid_credentials(self):
-        """Test authentication with wrong password raises error."""
-        # Given - Register and activate user
-        email = f"badpass-{uuid.uuid4().hex[:8]}@example.com"
-        user = self.user_service.register(email, "password123")
-        assert user is not None
-        activation_code = self.activation_repo.get_by_user_id(user.id)
-        assert activation_code is not None
-        self.user_service.activate_account(activation_code.code)
+    @pytest.mark.parametrize("scenario", ["wrong_password", "inactive_user", "nonexistent_user"])
+    def test_authentication_failure(self, activated_user_ctx, scenario):
+        """Test that every failed authentication raises the same InvalidCredentials."""
+        # Given - the shared activated user, an inactive user or an unknown email
+        user_service, *_ = activated_user_ctx
+        email, password = CANONICAL_EMAIL, "wrongpassword"
+        if scenario == "inactive_user":
+            # Registering writes: use the class container (reset before each test), not the
+            # read-only module context
+            user_service = self.user_service
+            email, password = f"inactive-{next(_COUNTER)}@example.com", "password123"
+            assert user_service.register(email, password) is not None
+        elif scenario == "nonexistent_user":
+            email, password = f"notfound-{next(_COUNTER)}@example.com", "password123"
 
         # When/Then
-        try:
-            self.user_service.authenticate(email, "wrongpassword")
-            assert False, "Should have raised InvalidCredentials"
-        except InvalidCredentials:
-            pass
+        with pytest.raises(InvalidCredentials):
+            user_service.authenticate(email, password)
 
-    def test_authentication_user_not_found(self):
-        """Test authentication with non-existent user raises error."""
-        # Given
-        fake_email = f"notfound-{uuid.uuid4().hex[:8]}@example.com"
+    def test_inactive_user_fails_before_password_check(self, mocker):
+        """Test that an inactive account is rejected without verifying the password."""
+        # Given - Register but don't activate
+        email = f"inactive-{next(_COUNTER)}@example.com"
+        self.user_service.register(email, "password123")
+        spy = mocker.spy(self.user_service.password_hasher, "verify")
 
         # When/Then
-        try:
-            self.user_service.authenticate(fake_email, "password123")
-            assert False, "Should have raised UserNotFound"
-        except UserNotFound:
-            pass
+        with pytest.raises(InvalidCredentials):
+            self.user_service.authenticate(email, "password123")
+        assert spy.call_count == 0
 
-    def test_authentication_inactive_user(self):
-        """Test authentication with inactive user raises error."""
-        # Given - Register but don't activate
-        email = f"inactive-{uuid.uuid4().hex[:8]}@example.com"
+    def test_email_is_case_insensitive(self):
+        """Test that emails are stored lowercased and matched regardless of case."""
+        # Given
+        suffix = next(_COUNTER)
+        user = self.user_service.register(f" Mixed-{suffix}@Example.COM ", "password123")
+        assert user is not None
+        assert user.email == f"mixed-{suffix}@example.com"
+
+        # Then - a case variant is the same account
+        assert self.user_service.register(f"MIXED-{suffix}@example.com", "password123") is None
+        assert self.user_service.get_user_by_email(f"Mixed-{suffix}@Example.com").id == user.id
+
+    def test_user_lookup_cache(self, monkeypatch):
+        """Test that only active users are cached; inactive and unknown ones are re-read."""
+        # Given - count repository reads
+        email = f"cached-{next(_COUNTER)}@example.com"
         user = self.user_service.register(email, "password123")
+        calls = []
+        get_by_email = self.user_repo.get_by_email
+        monkeypatch.setattr(
+            self.user_repo, "get_by_email", lambda email: calls.append(email) or get_by_email(email)
+        )
 
-        # When/Then
-        try:
-            self.user_service.authenticate(email, "password123")
-            assert False, "Should have raised InvalidCredentials"
-        except InvalidCredentials:
-            pass
+        # When / Then - an inactive account is read from the repository every time
+        self.user_service.get_user_by_email(email)
+        self.user_service.get_user_by_email(email)
+        assert len(calls) == 2
+
+        # Unknown emails are never cached
+        assert self.user_service.get_user_by_email("unknown@example.com") is None
+        assert self.user_service.get_user_by_email("unknown@example.com") is None
+        assert len(calls) == 4
+
+        # Activated behind the service's back (e.g. by another worker): seen on the next lookup
+        self.user_repo.activate_user(user.id)
+        assert self.user_service.get_user_by_email(email).is_active is True
+        assert len(calls) == 5
+
+        # Once active, repeated lookups hit the cache
+        self.user_service.get_user_by_email(email)
+        assert len(calls) == 5
+
+    def test_password_hasher_uses_configured_rounds(self):
+        """Test that the bcrypt cost factor comes from the hasher configuration."""
+        from src.services.password_hasher import BcryptPasswordHasher
+
+        hasher = BcryptPasswordHasher(rounds=4)
+        password_hash = hasher.hash("password123")
+
+        assert password_hash.startswith("$2b$04$")
+        assert hasher.verify("password123", password_hash) is True
 
 
 @pytest.mark.unit
@@ -183,12 +291,10 @@ class TestActivationCodeModelUnit:
 
     def test_activation_code_expiration_timing(self):
         """Test that activation codes expire after exactly 1 minute."""
-        import datetime
-
         from src.services.models import ActivationCode
 
         # Given
-        now = datetime.datetime.now(datetime.timezone.utc)
+        now = datetime.datetime.now(_UTC)
         code = ActivationCode(user_id="test-user", code="1234")
 
         # Then - should expire after 1 minute
@@ -204,16 +310,45 @@ class TestActivationCodeModelUnit:
         code.expires_at = now - datetime.timedelta(seconds=1)
         assert code.is_expired
 
+    def test_activation_code_naive_timestamps_are_utc(self):
+        """Test that naive timestamps are taken as UTC when the code is built."""
+        from src.services.models import ActivationCode
+
+        # Given - naive UTC timestamp one second in the past
+        naive_past = datetime.datetime.now(_UTC).replace(tzinfo=None) - datetime.timedelta(
+            seconds=1
+        )
+
+        # When
+        code = ActivationCode(user_id="test-user", code="1234", expires_at=naive_past)
+
+        # Then
+        assert code.expires_at.tzinfo is _UTC
+        assert code.created_at.tzinfo is not None
+        assert code.is_expired
+
 
 @pytest.mark.unit
 class TestRepositoryPatternsUnit:
     """Unit tests for repository implementations."""
 
+    @classmethod
+    def setup_class(cls):
+        """Wire one in-memory container for the whole class."""
+        cls.container = AppContainer(
+            use_postgresql=False,
+            use_mock_email=True,
+            password_hasher=FakeHasher(),
+            email_client=RecordingMailer(),
+        )
+
     def setup_method(self):
-        """Setup fresh in-memory repositories."""
-        self.container = AppContainer(use_postgresql=False, use_mock_email=True)
+        """Reset the shared repositories before each test."""
+        self.container.user_service().clear_user_cache()
         self.user_repo = self.container.user_repository()
+        self.user_repo.clear()
         self.activation_repo = self.container.activation_code_repository()
+        self.activation_repo.clear()
 
     def test_user_repository_crud(self):
         """Test user repository basic CRUD operations."""
@@ -238,6 +373,11 @@ class TestRepositoryPatternsUnit:
         assert self.user_repo.exists_by_email("test@example.com") is True
         assert self.user_repo.exists_by_email("notfound@example.com") is False
 
+        # Conditional insert: taken email is reported as None, nothing is overwritten
+        duplicate = User(email="test@example.com", password_hash="other", is_active=False)
+        assert self.user_repo.create_if_absent(duplicate) is None
+        assert self.user_repo.get_by_email("test@example.com").id == created_user.id
+
         # Update
         created_user.is_active = True
         updated_user = self.user_repo.update(created_user)
@@ -269,3 +409,598 @@ class TestRepositoryPatternsUnit:
         # Should not find after delete
         assert self.activation_repo.get_by_user_id("user-123") is None
         assert self.activation_repo.get_by_code(code.code) is None
+
+    def test_activation_code_cleanup_expired(self):
+        """Test that cleanup drops expired codes from both lookups and keeps live ones."""
+        # Given - one expired and one live code
+        expired = self.activation_repo.create("user-expired")
+        live = self.activation_repo.create("user-live")
+        expired.expires_at = datetime.datetime.now(_UTC) - datetime.timedelta(seconds=1)
+
+        # When
+        cleaned = self.activation_repo.cleanup_expired()
+
+        # Then
+        assert cleaned == 1
+        assert self.activation_repo.get_by_user_id("user-expired") is None
+        assert self.activation_repo.get_by_code(expired.code) is None
+        assert self.activation_repo.get_by_code(live.code) is live
+
+    def test_periodic_cleanup_removes_expired_codes(self):
+        """Test that the background sweep started by the app deletes expired codes."""
+        import asyncio
+
+        from src.api.server import cleanup_expired_codes_periodically
+
+        # Given - an expired code
+        user_service = self.container.user_service()
+        expired = self.activation_repo.create("user-expired")
+        expired.expires_at = datetime.datetime.now(_UTC) - datetime.timedelta(seconds=1)
+
+        # When - the sweep runs for a few short intervals
+        async def run_sweep():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(cleanup_expired_codes_periodically(user_service, 0.01), 0.1)
+
+        asyncio.run(run_sweep())
+
+        # Then
+        assert self.activation_repo.get_by_user_id("user-expired") is None
+
+    def test_sweep_concurrent_with_requests_keeps_codes_consistent(self):
+        """Test that sweeping while request threads issue codes never loses or reuses one."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def issue(worker: int) -> None:
+            for i in range(500):
+                code = self.activation_repo.create(f"user-{worker}-{i % 50}")
+                if i % 3 == 0:
+                    code.expires_at = datetime.datetime.now(_UTC) - datetime.timedelta(seconds=1)
+
+        def sweep() -> None:
+            for _ in range(200):
+                self.activation_repo.cleanup_expired()
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(issue, worker) for worker in range(4)] + [pool.submit(sweep)]
+            for future in futures:
+                future.result()
+
+        # Then - every code is either assigned once or free, never both or neither
+        assigned = [code.code for code in self.activation_repo._codes.values()]
+        free = self.activation_repo._free_codes
+        assert len(set(assigned)) == len(assigned)
+        assert sorted(assigned + free) == [f"{i:04d}" for i in range(10000)]
+
+    def test_activation_codes_are_unique_and_recycled(self):
+        """Test that the 10,000 codes are handed out once each and reused after release."""
+        # Given - exhaust the whole 4-digit code space
+        codes = {self.activation_repo.create(f"user-{i}").code for i in range(10000)}
+        assert len(codes) == 10000
+
+        with pytest.raises(ValueError):
+            self.activation_repo.create("user-overflow")
+
+        # When - one code is released
+        released = self.activation_repo.get_by_user_id("user-42").code
+        self.activation_repo.delete("user-42")
+
+        # Then - it is the only one available again
+        assert self.activation_repo.create("user-overflow").code == released
+
+
+@pytest.mark.unit
+class TestAuthCacheUnit:
+    """Unit tests for the Basic Auth resolution cache in FastAPI dependencies."""
+
+    @pytest.fixture(autouse=True)
+    def setup_auth_cache(self, activated_user_ctx):
+        """Reuse the shared activated user and start from an empty auth cache."""
+        from src.api.deps import clear_auth_cache
+
+        clear_auth_cache()
+        self.user_service, *_ = activated_user_ctx
+
+    def _header(self, password: str) -> str:
+        return "Basic " + base64.b64encode(f"{CANONICAL_EMAIL}:{password}".encode()).decode()
+
+    def test_successful_authentication_is_cached(self, mocker):
+        """Test that a repeated valid header skips the service."""
+        from src.api.deps import get_basic_user
+
+        header = self._header(CANONICAL_PASSWORD)
+        first = get_basic_user(authorization=header, user_service=self.user_service)
+
+        spy = mocker.spy(self.user_service, "authenticate_basic_credentials")
+        second = get_basic_user(authorization=header, user_service=self.user_service)
+
+        assert second is first
+        assert spy.call_count == 0
+
+    def test_failed_authentication_is_not_cached(self, mocker):
+        """Test that invalid credentials are re-checked on every request."""
+        from fastapi import HTTPException
+
+        from src.api.deps import get_basic_user
+
+        header = self._header("wrongpassword")
+        spy = mocker.spy(self.user_service, "authenticate_basic_credentials")
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                get_basic_user(authorization=header, user_service=self.user_service)
+
+        assert spy.call_count == 2
+
+    @pytest.mark.parametrize(
+        "make_header",
+        [
+            lambda header: header.replace("Basic ", "Basic  "),
+            lambda header: header.replace("Basic ", "Basic\t") + "  ",
+            lambda header: header + " ",
+            lambda header: header + "\n",
+            lambda header: header[:12] + "\xff" + header[12:],
+        ],
+        ids=["two-spaces", "tab-and-trailing", "trailing-space", "trailing-newline", "non-ascii"],
+    )
+    def test_lax_variants_of_valid_header_are_rejected(self, make_header):
+        """Test that whitespace or non-ASCII noise around valid credentials is a 401."""
+        from fastapi import HTTPException
+
+        from src.api.deps import get_basic_user
+
+        # The untouched header authenticates (and is cached), its variants must not
+        header = self._header(CANONICAL_PASSWORD)
+        assert get_basic_user(authorization=header, user_service=self.user_service)
+        with pytest.raises(HTTPException) as exc_info:
+            get_basic_user(authorization=make_header(header), user_service=self.user_service)
+
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.parametrize(
+        "header",
+        ["Invalid Header", "basic dTpw", "Basic  dTpw", "Basic dTpw!", "Basic bm9jb2xvbg=="],
+    )
+    def test_basic_header_parsing_is_strict(self, header):
+        """Test that malformed Basic headers (scheme, spacing, base64, separator) are a 401."""
+        from fastapi import HTTPException
+
+        from src.api.deps import get_basic_user
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_basic_user(authorization=header, user_service=self.user_service)
+
+        assert exc_info.value.status_code == 401
+
+
+@pytest.mark.unit
+class TestTokenServiceUnit:
+    """Unit tests for Bearer access tokens."""
+
+    @pytest.fixture(autouse=True)
+    def setup_token_service(self, activated_user_ctx):
+        """Reuse the shared activated user and build a token service."""
+        from src.services.token_service import TokenService
+
+        self.user_service, self.user, *_ = activated_user_ctx
+        self.token_service = TokenService(secret="test-secret", expiry_minutes=15)
+
+    def test_issued_token_resolves_to_user(self):
+        """Test that a freshly issued token verifies to its user id."""
+        token = self.token_service.issue(user=self.user)
+
+        assert self.token_service.verify(token=token) == self.user.id
+
+    @pytest.mark.parametrize("expiry_minutes, secret", [(-1, "test-secret"), (15, "other-secret")])
+    def test_expired_or_foreign_token_is_rejected(self, expiry_minutes, secret):
+        """Test that expired tokens and tokens signed with another key are refused."""
+        from src.services.token_service import TokenService
+
+        token = TokenService(secret=secret, expiry_minutes=expiry_minutes).issue(user=self.user)
+
+        with pytest.raises(InvalidCredentials):
+            self.token_service.verify(token=token)
+
+    def test_bearer_authentication_skips_password_check(self, mocker):
+        """Test that a Bearer token authenticates without bcrypt verification."""
+        from src.api.deps import get_current_user
+
+        spy = mocker.spy(self.user_service.password_hasher, "verify")
+        token = self.token_service.issue(user=self.user)
+
+        user = get_current_user(
+            user_service=self.user_service,
+            token_service=self.token_service,
+            authorization=f"Bearer {token}",
+        )
+
+        assert user.id == self.user.id
+        assert spy.call_count == 0
+
+    def test_inactive_user_is_forbidden(self):
+        """Test that get_current_user enforces activation itself (403)."""
+        from fastapi import HTTPException
+
+        from src.api.deps import get_current_user
+
+        # Registering writes: use a container of its own, not the read-only module context
+        container = AppContainer(
+            use_postgresql=False,
+            use_mock_email=True,
+            password_hasher=FakeHasher(),
+            email_client=RecordingMailer(),
+        )
+        user_service = container.user_service()
+        inactive = user_service.register(
+            f"inactive-token-{next(_COUNTER)}@example.com", "password123"
+        )
+        token = self.token_service.issue(user=inactive)
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(
+                user_service=user_service,
+                token_service=self.token_service,
+                authorization=f"Bearer {token}",
+            )
+
+        assert exc_info.value.status_code == 403
+        container.cleanup_resources()
+
+
+@pytest.mark.unit
+class TestProvidersUnit:
+    """Unit tests for DI providers."""
+
+    def test_singleton_provider_builds_once(self):
+        """Test that the factory runs once and the same instance is returned afterwards."""
+        from src.di.providers import SingletonProvider
+
+        calls = []
+        provider = SingletonProvider(lambda: calls.append(1) or object())
+
+        first = provider.provide()
+        second = provider.provide()
+
+        assert first is second
+        assert len(calls) == 1
+
+    def test_singleton_provider_concurrent_first_access(self):
+        """Test that racing threads on first access share a single factory call."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.di.providers import SingletonProvider
+
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def slow_factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        provider = SingletonProvider(slow_factory)
+
+        def resolve():
+            barrier.wait()
+            return provider.provide()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instances = list(pool.map(lambda _: resolve(), range(8)))
+
+        assert len(calls) == 1
+        assert all(instance is instances[0] for instance in instances)
+
+
+@pytest.mark.unit
+class TestSMTPMailerUnit:
+    """Unit tests for the SMTP mailer (smtplib is mocked)."""
+
+    def test_session_is_reused_across_emails(self, mocker):
+        """Test that consecutive emails share one SMTP connection and login."""
+        from src.persistances.email_client import SMTPMailer
+
+        smtp_class = mocker.patch("smtplib.SMTP")
+        smtp_class.return_value.noop.return_value = (250, b"OK")
+        mailer = SMTPMailer("smtp.example.com", 587, "user", "secret", use_tls=True)
+
+        assert mailer.send_activation_email("a@example.com", "1234")
+        assert mailer.send_activation_email("b@example.com", "5678")
+
+        assert smtp_class.call_count == 1
+        assert smtp_class.return_value.login.call_count == 1
+        assert smtp_class.return_value.send_message.call_count == 2
+
+    def test_dropped_session_is_reopened(self, mocker):
+        """Test that a session failing the NOOP check is replaced."""
+        import smtplib
+
+        from src.persistances.email_client import SMTPMailer
+
+        smtp_class = mocker.patch("smtplib.SMTP")
+        mailer = SMTPMailer("smtp.example.com", 587, "", "", use_tls=False)
+        assert mailer.send_activation_email("a@example.com", "1234")
+
+        smtp_class.return_value.noop.side_effect = smtplib.SMTPServerDisconnected()
+        assert mailer.send_activation_email("a@example.com", "1234")
+
+        assert smtp_class.call_count == 2
+
+    def test_session_dropped_during_send_is_closed(self, mocker):
+        """Test that a session lost mid-send is closed before the retry opens a new one."""
+        import smtplib
+
+        from src.persistances.email_client import SMTPMailer
+
+        smtp_class = mocker.patch("smtplib.SMTP")
+        smtp_class.return_value.send_message.side_effect = [
+            smtplib.SMTPServerDisconnected(),
+            None,
+        ]
+        mailer = SMTPMailer("smtp.example.com", 587, "", "", use_tls=False)
+
+        assert mailer.send_activation_email("a@example.com", "1234")
+
+        assert smtp_class.call_count == 2
+        assert smtp_class.return_value.close.call_count == 1
+
+
+@pytest.mark.unit
+class TestQueuedMailerUnit:
+    """Unit tests for the queued email path (no broker: the task runs eagerly)."""
+
+    def test_queued_mailer_enqueues_email_and_code(self, mocker):
+        """Test that QueuedMailer hands (email, code) to the enqueue callable."""
+        from src.persistances.email_client import QueuedMailer
+
+        enqueue = mocker.Mock()
+        mailer = QueuedMailer(enqueue=enqueue)
+
+        assert mailer.send_activation_email("queued@example.com", "1234") is True
+        enqueue.assert_called_once_with("queued@example.com", "1234")
+
+    def test_email_task_delegates_to_smtp_mailer(self, mocker):
+        """Test that the Celery task delivers through the SMTP mailer."""
+        from src.persistances.email_client import SMTPMailer
+        from src.tasks import email_tasks
+
+        smtp_mailer = mocker.create_autospec(SMTPMailer, instance=True)
+        smtp_mailer.send_activation_email.return_value = True
+        mocker.patch.object(email_tasks, "_get_delivery_client", return_value=smtp_mailer)
+
+        result = email_tasks.send_activation_email.apply(args=("queued@example.com", "1234"))
+
+        assert result.successful()
+        smtp_mailer.send_activation_email.assert_called_once_with("queued@example.com", "1234")
+
+
+@pytest.mark.unit
+class TestDatabaseUnit:
+    """Unit tests for the database layer (psycopg2 is mocked)."""
+
+    def test_pool_can_be_reopened_after_close(self, mocker):
+        """Test that get_pool() after close_pool() builds a fresh connection pool."""
+        from src.persistances import db
+
+        threaded_pool = mocker.patch("psycopg2.pool.ThreadedConnectionPool")
+        first = db.get_pool()
+        db.close_pool()
+
+        second = db.get_pool()
+        try:
+            assert second is not first
+            assert threaded_pool.call_count == 2
+            assert threaded_pool.return_value.closeall.call_count == 1
+        finally:
+            db.close_pool()
+
+    def test_prepared_statement_is_prepared_once_per_connection(self, mocker):
+        """Test that execute_prepared sends PREPARE only on first use of a connection."""
+        from src.persistances import db
+
+        cursor = mocker.MagicMock()
+        cursor.connection.prepared_statements = set()
+
+        db.execute_prepared(cursor, "by_code", "SELECT 1 WHERE $1 = $1", ("1234",))
+        db.execute_prepared(cursor, "by_code", "SELECT 1 WHERE $1 = $1", ("5678",))
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert statements == [
+            "PREPARE by_code AS SELECT 1 WHERE $1 = $1",
+            "EXECUTE by_code (%s)",
+            "EXECUTE by_code (%s)",
+        ]
+
+
+@pytest.mark.unit
+class TestApiUnit:
+    """Unit tests through the HTTP app (in-memory container, real bcrypt hasher)."""
+
+    def setup_method(self):
+        """Install an in-memory container as the global one."""
+        from src.di.container import set_test_container
+
+        self.container = AppContainer(use_postgresql=False, use_mock_email=True)
+        set_test_container(self.container)
+
+    def teardown_method(self):
+        """Restore the default global container."""
+        from src.di.container import reset_container
+
+        reset_container()
+
+    def _register_and_log_in(self, client) -> str:
+        email = f"api{next(_COUNTER)}@example.com"
+        response = client.post("/api/v1/users", json={"email": email, "password": "password123"})
+        assert response.status_code == 201
+        user_id = response.json()["user_id"]
+
+        code = self.container.activation_code_repository().get_by_user_id(user_id).code
+        response = client.patch(f"/api/v1/users/{user_id}", json={"activation_code": code})
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/users/me", auth=(email, "password123"))
+        assert response.status_code == 200
+        return email
+
+    def test_lifespan_can_run_twice(self):
+        """Test that a second startup after shutdown still hashes and verifies passwords."""
+        from fastapi.testclient import TestClient
+
+        from src.main import app
+
+        for _ in range(2):
+            with TestClient(app) as client:
+                self._register_and_log_in(client)
+
+    def test_token_grants_bearer_access(self):
+        """Test that a token from POST /api/v1/token authenticates later requests."""
+        from fastapi.testclient import TestClient
+
+        from src.main import app
+
+        with TestClient(app) as client:
+            email = self._register_and_log_in(client)
+
+            response = client.post("/api/v1/token", auth=(email, "password123"))
+            assert response.status_code == 200
+            body = response.json()
+            assert body["token_type"] == "bearer"
+            assert body["expires_in"] == 15 * 60
+
+            bearer = {"Authorization": f"Bearer {body['access_token']}"}
+            response = client.get("/api/v1/users/me", headers=bearer)
+            assert response.status_code == 200
+            assert response.json()["email"] == email
+
+            response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer nope"})
+            assert response.status_code == 401
+
+    def test_token_service_requires_jwt_secret(self, monkeypatch):
+        """Test that startup fails without a shared JWT_SECRET instead of using a random one."""
+        from src.config.settings import reset_settings
+
+        monkeypatch.delenv("JWT_SECRET")
+        reset_settings()
+        try:
+            with pytest.raises(ValueError, match="JWT_SECRET"):
+                AppContainer(use_postgresql=False, use_mock_email=True).warm_up()
+        finally:
+            monkeypatch.undo()
+            reset_settings()
+
+
+@pytest.mark.unit
+class TestPostgreSQLUserRepositoryUnit:
+    """Unit tests for the PostgreSQL user repository's retry logic (database is mocked)."""
+
+    class FakeUniqueViolation(Exception):
+        """Stand-in for psycopg2's UniqueViolation with a settable constraint name."""
+
+        def __init__(self, constraint_name: str) -> None:
+            super().__init__(constraint_name)
+            self.diag = type("Diag", (), {"constraint_name": constraint_name})()
+
+    @pytest.fixture(autouse=True)
+    def mocked_db(self, mocker):
+        """Patch the cursor and statement helpers seen by the repository module."""
+        from src.persistances.repositories.implementations import postgresql_user_repository
+
+        mocker.patch("psycopg2.errors.UniqueViolation", self.FakeUniqueViolation)
+        self.cursor = mocker.MagicMock()
+        get_db_cursor = mocker.patch.object(postgresql_user_repository, "get_db_cursor")
+        get_db_cursor.return_value.__enter__.return_value = self.cursor
+        self.execute_prepared = mocker.patch.object(postgresql_user_repository, "execute_prepared")
+        from src.services.models import User
+
+        self.repo = postgresql_user_repository.PostgreSQLUserRepository()
+        self.user = User(email="pg@example.com", password_hash="fake$pw")
+
+    def test_code_collision_is_retried(self):
+        """Test that a clash on the activation code index draws a new code."""
+        now = datetime.datetime.now(_UTC)
+        self.execute_prepared.side_effect = [
+            self.FakeUniqueViolation("idx_activation_codes_code"),
+            None,
+        ]
+        self.cursor.fetchone.return_value = {
+            "email": self.user.email,
+            "password_hash": self.user.password_hash,
+            "id": "user-1",
+            "is_active": False,
+            "created_at": now,
+            "code": "1234",
+            "code_created_at": now,
+            "expires_at": now + datetime.timedelta(minutes=1),
+        }
+
+        user, activation_code = self.repo.create_with_activation_code(self.user, None)
+
+        assert self.execute_prepared.call_count == 2
+        assert (user.id, user.email, activation_code.code) == ("user-1", self.user.email, "1234")
+
+    def test_other_unique_violation_is_not_retried(self):
+        """Test that a clash on another unique index propagates instead of retrying."""
+        self.execute_prepared.side_effect = self.FakeUniqueViolation("users_email_key")
+
+        with pytest.raises(self.FakeUniqueViolation):
+            self.repo.create_with_activation_code(self.user, None)
+
+        assert self.execute_prepared.call_count == 1
+
+
+@pytest.mark.unit
+class TestErrorHandlerUnit:
+    """Unit tests for the service exception handler."""
+
+    def test_subclass_uses_closest_mapped_ancestor(self):
+        """Test that a subclass of a mapped exception gets its parent's response, not a 500."""
+        from src.api.errors_handler import service_error_handler
+
+        class ExpiredCredentials(InvalidCredentials):
+            pass
+
+        response = service_error_handler(None, ExpiredCredentials())
+
+        assert response.status_code == 401
+        assert response.body == b'{"detail":"Invalid credentials"}'
+
+
+@pytest.mark.unit
+class TestSettingsUnit:
+    """Unit tests for settings derived from the environment."""
+
+    @pytest.mark.parametrize("workers, pool_max_size", [("1", 80), ("4", 20), ("200", 1)])
+    def test_connection_budget_is_split_across_workers(self, monkeypatch, workers, pool_max_size):
+        """Test that workers x per-worker pool never exceeds DB_MAX_CONNECTIONS by default."""
+        from src.config.settings import AppSettings
+
+        monkeypatch.setenv("WORKERS", workers)
+        monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+        monkeypatch.setenv("DB_MAX_CONNECTIONS", "80")
+
+        database_settings = AppSettings.from_env().database_settings
+
+        assert database_settings.pool_max_size == pool_max_size
+        assert database_settings.pool_min_size <= database_settings.pool_max_size
+
+
+@pytest.mark.unit
+class TestCodeCleanupElectionUnit:
+    """Unit tests for electing a single periodic sweeper among worker processes."""
+
+    def test_only_one_process_claims_the_sweep(self, monkeypatch, tmp_path):
+        """Test that the sweeper role is exclusive and released when its lock file closes."""
+        from src.api import server
+
+        monkeypatch.setattr(server, "_CODE_CLEANUP_LOCK_PATH", str(tmp_path / "cleanup.lock"))
+
+        first = server.claim_code_cleanup()
+        assert first is not None
+        # flock locks are per open file: a second open behaves like another worker
+        assert server.claim_code_cleanup() is None
+
+        first.close()
+        again = server.claim_code_cleanup()
+        assert again is not None
+        again.close()